@@ -1,16 +1,25 @@
-from flask import Flask, request, jsonify, send_file, send_from_directory
+from flask import Flask, Response, request, jsonify, send_file, send_from_directory
 from flask_cors import CORS
 import pandas as pd
+from pandas.io.parsers import TextParser
+import numpy as np
 import os
 import sys
 import uuid
 import re
+import glob
+import json
+import pickle
+import importlib.util
 from datetime import datetime
 import traceback
 import googlemaps
 from geopy.geocoders import GoogleV3
+from geopy.extra.rate_limiter import RateLimiter
 from dotenv import load_dotenv
+from werkzeug.utils import secure_filename
 from functools import lru_cache
+from collections import OrderedDict
 import logging
 import threading
 import time
@@ -24,6 +33,26 @@ except ImportError:
     # Fallback for environments without concurrent.futures
     CONCURRENT_SUPPORT = False
     import threading
+try:
+    import orjson
+    ORJSON_SUPPORT = True
+except ImportError:
+    # Fallback to Flask's stdlib-json jsonify
+    ORJSON_SUPPORT = False
+try:
+    import diskcache
+    DISKCACHE_SUPPORT = True
+except ImportError:
+    # Fallback to the in-memory geocode cache only
+    DISKCACHE_SUPPORT = False
+try:
+    import python_calamine  # noqa: F401 - enables pd.read_excel(engine='calamine')
+    CALAMINE_SUPPORT = True
+except ImportError:
+    # Fallback to openpyxl/xlrd for reading uploads
+    CALAMINE_SUPPORT = False
+# Checked without importing: pyarrow is large and only needed when Arrow dtypes are enabled
+PYARROW_SUPPORT = importlib.util.find_spec('pyarrow') is not None
 
 # Mediacorp ADC Processor imports
 from mc_services import (
@@ -114,11 +143,67 @@ load_dotenv()
 app = Flask(__name__, static_folder='static', static_url_path='')
 CORS(app)
 
+# Hand file downloads to the fronting web server via the X-Sendfile header so
+# workers only emit headers. Opt-in: without a server that honours the header
+# (e.g. Gunicorn serving directly on Azure/Render) downloads would be empty.
+app.config['USE_X_SENDFILE'] = os.getenv('USE_X_SENDFILE', 'false').lower() == 'true'
+
+
+def ojson(payload, status=200):
+    """Build a JSON response with orjson, which also serializes NumPy scalars from pandas results"""
+    if not ORJSON_SUPPORT:
+        return jsonify(payload), status
+    return Response(
+        orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY),
+        status=status,
+        mimetype='application/json'
+    )
+
 
 # Configuration
 UPLOAD_FOLDER = os.getenv('UPLOAD_FOLDER', 'uploads')
 PROCESSED_FOLDER = os.getenv('PROCESSED_FOLDER', 'processed')
 
+# Google Maps address geocoding: parallel requests, throttled below Google's 50 QPS limit
+GEOCODING_MAX_WORKERS = int(os.getenv('GEOCODING_MAX_WORKERS', 8))
+GEOCODING_MIN_DELAY_SECONDS = 1 / 40
+# Panel sheets of one workbook transformed concurrently
+SHEET_MAX_WORKERS = 2
+# Background transforms for single uploads submitted with async=true
+UPLOAD_MAX_WORKERS = int(os.getenv('UPLOAD_MAX_WORKERS', 2))
+# A background upload still "processing" after this long is reported as failed (e.g. its worker was killed)
+UPLOAD_JOB_TIMEOUT_SECONDS = int(os.getenv('UPLOAD_JOB_TIMEOUT_SECONDS', 1800))
+# Successful address geocodes are cached in memory and, with diskcache installed, on disk for 30 days
+GEOCODE_CACHE_DIR = os.getenv('GEOCODE_CACHE_DIR', os.path.join('cache', 'geocode'))
+GEOCODE_CACHE_TTL_SECONDS = 30 * 24 * 60 * 60
+GEOCODE_MEMORY_CACHE_SIZE = 10000
+
+# Opt-in faster reader for uploaded workbooks. calamine turns whitespace-only cells
+# into NaN (openpyxl keeps them), which can change operating-hours fallbacks.
+EXCEL_READ_ENGINE = os.getenv('EXCEL_READ_ENGINE', '').strip().lower() or None
+# Opt-in Arrow-backed columns for the sheet being transformed. Columns mixing numbers
+# and text are read as text, so e.g. a numeric Address2 cell is written back as a string.
+EXCEL_DTYPE_BACKEND = os.getenv('EXCEL_DTYPE_BACKEND', '').strip().lower() or None
+# Header detection only inspects the top of each sheet
+HEADER_SCAN_ROWS = 50
+
+# Postal code patterns, compiled once and shared by the scalar and vectorized extractors
+_POSTAL_RE = re.compile(r'SINGAPORE\s+(\d{6})', re.IGNORECASE)
+_SIX_DIGIT_RE = re.compile(r'\b(\d{6})\b')
+_FIVE_DIGIT_RE = re.compile(r'\b\d{5}\b')
+_MALAYSIA_POSTAL_RES = [
+    # Pattern 1: Standalone 5-digit codes (81300 SKUDAI, JOHOR)
+    re.compile(r'\b(\d{5})\b', re.IGNORECASE),
+    # Pattern 2: City followed by postal code (KULAI 81000)
+    re.compile(r'\b[A-Za-z\s]+\s+(\d{5})', re.IGNORECASE),
+    # Pattern 3: Postal code at end (TAMAN PERLING, 81200)
+    re.compile(r',\s*(\d{5})\s*$', re.IGNORECASE),
+    # Pattern 4: Postal code before end tokens
+    re.compile(r'(\d{5})(?=\s*(?:$|,|\s+(?:JOHOR|SELANGOR|MALAYSIA)))', re.IGNORECASE),
+    # Pattern 5: Any 5-digit sequence (most permissive)
+    re.compile(r'(\d{5})', re.IGNORECASE),
+]
+
 # Postal code master file paths (in order of preference)
 POSTAL_CODE_PATHS = [
     os.getenv('POSTAL_CODE_MASTER_FILE'),  # Environment variable (highest priority)
@@ -150,9 +235,60 @@ os.makedirs(PROCESSED_FOLDER, exist_ok=True)
 
 # Initialize cleanup service
 from cleanup_service import CleanupService
-cleanup_service = CleanupService(UPLOAD_FOLDER, PROCESSED_FOLDER, ttl_minutes=15)
+cleanup_service = CleanupService(UPLOAD_FOLDER, PROCESSED_FOLDER, ttl_minutes=15, job_timeout_seconds=UPLOAD_JOB_TIMEOUT_SECONDS)
 # Global postal code lookup - loaded once at module startup
 _POSTAL_CODE_LOOKUP_CACHE = None
+# Same lookup as a (lat, lng) DataFrame indexed by postal code, for vectorized joins
+_POSTAL_CODE_LOOKUP_FRAME = None
+
+def _postal_code_cache_path(master_file_path):
+    """Pickled lookup cache lives next to the master file it was built from"""
+    return os.path.splitext(master_file_path)[0] + '.lookup.pkl'
+
+def _read_postal_code_cache(master_file_path):
+    """Load the pickled lookup if it is at least as new as the master file, else None"""
+    cache_path = _postal_code_cache_path(master_file_path)
+    try:
+        if os.path.getmtime(cache_path) < os.path.getmtime(master_file_path):
+            logger.info(f"Postal code cache is stale, rebuilding: {cache_path}")
+            return None
+        with open(cache_path, 'rb') as f:
+            lookup = pickle.load(f)
+        return lookup if isinstance(lookup, dict) else None
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Could not read postal code cache {cache_path}: {e}")
+        return None
+
+def _write_postal_code_cache(master_file_path, lookup):
+    """Persist the parsed lookup for the next start; failures (e.g. read-only data dir) are non-fatal"""
+    cache_path = _postal_code_cache_path(master_file_path)
+    temp_path = None
+    try:
+        # Write to a temp file and rename so concurrent workers never read a partial pickle
+        with tempfile.NamedTemporaryFile('wb', dir=os.path.dirname(cache_path) or '.', suffix='.tmp', delete=False) as f:
+            temp_path = f.name
+            pickle.dump(lookup, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, cache_path)
+        logger.info(f"Postal code cache written: {cache_path}")
+    except Exception as e:
+        logger.warning(f"Could not write postal code cache {cache_path}: {e}")
+        if temp_path and os.path.exists(temp_path):
+            os.unlink(temp_path)
+
+def _coerce_coordinates(values):
+    """Coordinate column as float64, with unparseable cells as NaN"""
+    if pd.api.types.is_float_dtype(values) or pd.api.types.is_integer_dtype(values):
+        return values.astype('float64')
+
+    def to_float(value):
+        try:
+            return float(value)
+        except (ValueError, TypeError):
+            return np.nan
+
+    return values.map(to_float).astype('float64')
 
 def _load_postal_code_lookup_once():
     """Load postal code lookup table once at module level - shared across all instances"""
@@ -198,6 +334,14 @@ def _load_postal_code_lookup_once():
             _POSTAL_CODE_LOOKUP_CACHE = {}
             return _POSTAL_CODE_LOOKUP_CACHE
 
+        # Fast path: reuse the lookup parsed on a previous start
+        lookup = _read_postal_code_cache(master_file_path)
+        if lookup is not None:
+            logger.info(f"Loaded {len(lookup):,} postal codes from cache: {_postal_code_cache_path(master_file_path)}")
+            logger.info("=" * 60)
+            _POSTAL_CODE_LOOKUP_CACHE = lookup
+            return _POSTAL_CODE_LOOKUP_CACHE
+
         logger.info(f"Loading postal code data...")
 
         # Detect file type and load accordingly
@@ -205,60 +349,35 @@ def _load_postal_code_lookup_once():
         logger.info(f"File format: {file_extension.upper()}")
 
         if file_extension == '.csv':
-            df = pd.read_csv(master_file_path, dtype={'postal_code': str})
             postal_col = 'postal_code'
             lat_col = 'Latitude'
             lng_col = 'Longitude'
+            df = pd.read_csv(master_file_path, usecols=[postal_col, lat_col, lng_col], dtype={postal_col: str})
         else:  # Excel format (.xlsx, .xls)
-            df = pd.read_excel(master_file_path, dtype={'PostalCode': str})
             postal_col = 'PostalCode'
             lat_col = 'Latitude'
             lng_col = 'Longitude'
+            df = pd.read_excel(master_file_path, usecols=[postal_col, lat_col, lng_col], dtype={postal_col: str})
 
         total_rows = len(df)
         logger.info(f"Total rows in file: {total_rows:,}")
         logger.info(f"Columns: {postal_col}, {lat_col}, {lng_col}")
 
-        # Create dictionary for fast lookup: {postal_code: (lat, lng)}
-        lookup = {}
-        row_count = 0
-        skipped_rows = 0
-        sample_codes = []
-
-        for _, row in df.iterrows():
-            row_count += 1
-            if row_count % 20000 == 0:  # Progress indicator (adjusted for larger files)
-                logger.info(f"Processing row {row_count:,}/{total_rows:,} ({row_count*100//total_rows}%)...")
-
-            # Handle postal code formatting
-            postal_code_raw = row.get(postal_col)
-            if pd.notna(postal_code_raw) and postal_code_raw:
-                try:
-                    # Ensure 6-digit format (handles 5-digit codes by adding leading zero)
-                    if isinstance(postal_code_raw, str):
-                        postal_code = postal_code_raw.strip().zfill(6)
-                    else:
-                        postal_code = f"{int(float(postal_code_raw)):06d}"
-                except (ValueError, TypeError):
-                    skipped_rows += 1
-                    continue
-            else:
-                skipped_rows += 1
-                continue
+        # Postal codes are read as text; ensure 6-digit format (handles 5-digit codes by adding leading zero)
+        postal_raw = df[postal_col]
+        postal_codes = postal_raw.str.strip().str.zfill(6).where(postal_raw.notna() & postal_raw.ne(''))
 
-            lat = row.get(lat_col)
-            lng = row.get(lng_col)
-            if pd.notna(lat) and pd.notna(lng):
-                try:
-                    lookup[postal_code] = (float(lat), float(lng))
-                    # Store first 3 postal codes as samples
-                    if len(sample_codes) < 3:
-                        sample_codes.append((postal_code, lat, lng))
-                except (ValueError, TypeError):
-                    skipped_rows += 1
-                    continue
-            else:
-                skipped_rows += 1
+        latitudes = _coerce_coordinates(df[lat_col])
+        longitudes = _coerce_coordinates(df[lng_col])
+        valid = postal_codes.notna() & latitudes.notna() & longitudes.notna()
+
+        # Create dictionary for fast lookup: {postal_code: (lat, lng)}
+        lookup = dict(zip(
+            postal_codes[valid].tolist(),
+            zip(latitudes[valid].tolist(), longitudes[valid].tolist())
+        ))
+        skipped_rows = total_rows - int(valid.sum())
+        sample_codes = [(code, lat, lng) for code, (lat, lng) in list(lookup.items())[:3]]
 
         logger.info("=" * 60)
         logger.info(f"POSTAL CODE LOADING COMPLETE")
@@ -273,6 +392,8 @@ def _load_postal_code_lookup_once():
                 logger.info(f"  {code}: ({lat}, {lng})")
 
         logger.info("=" * 60)
+        if lookup:
+            _write_postal_code_cache(master_file_path, lookup)
         _POSTAL_CODE_LOOKUP_CACHE = lookup
         return _POSTAL_CODE_LOOKUP_CACHE
 
@@ -282,13 +403,38 @@ def _load_postal_code_lookup_once():
         _POSTAL_CODE_LOOKUP_CACHE = {}
         return _POSTAL_CODE_LOOKUP_CACHE
 
+def _load_postal_code_lookup_frame_once():
+    """Build the postal code lookup DataFrame once from the shared lookup dict"""
+    global _POSTAL_CODE_LOOKUP_FRAME
+
+    if _POSTAL_CODE_LOOKUP_FRAME is None:
+        lookup = _load_postal_code_lookup_once()
+        _POSTAL_CODE_LOOKUP_FRAME = pd.DataFrame(
+            list(lookup.values()),
+            index=pd.Index(list(lookup.keys()), dtype=object),
+            columns=['lat', 'lng'],
+            dtype='float64'
+        )
+    return _POSTAL_CODE_LOOKUP_FRAME
+
 class GeocodingService:
+    # Shared long-lived instances (see get_geocoder): fixed attribute set, no per-instance __dict__
+    __slots__ = (
+        'use_google_api', 'google_api_key', 'masked_key', 'gmaps', 'geolocator',
+        'rate_limited_geocode', 'postal_code_lookup', 'geocode_stats', 'stats_lock',
+        'address_cache', 'address_cache_lock', 'disk_cache'
+    )
+
     def __init__(self, use_google_api=True):
         self.use_google_api = use_google_api
         self.google_api_key = os.getenv('GOOGLE_MAPS_API_KEY')
+        # Masked once here so /health never touches the raw key
+        self.masked_key = ('****' + self.google_api_key[-4:]) if self.google_api_key else None
         self._initialize_google_maps_clients()
         self.postal_code_lookup = _load_postal_code_lookup_once()  # Use shared global lookup
-        self.geocode_stats = {'postal_matches': 0, 'api_calls': 0, 'failures': 0}
+        self.geocode_stats = {'postal_matches': 0, 'api_calls': 0, 'failures': 0, 'cache_hits': 0}
+        self.stats_lock = threading.Lock()  # Stats are updated from geocoding worker threads
+        self._initialize_address_cache()
     
     def _initialize_google_maps_clients(self):
         """Initialize Google Maps API clients with status logging"""
@@ -296,45 +442,168 @@ class GeocodingService:
             logger.info("Google Maps API: DISABLED BY USER - Using postal code lookup only")
             self.gmaps = None
             self.geolocator = None
+            self.rate_limited_geocode = None
             return
 
         if not self.google_api_key:
             logger.info("Google Maps API: NOT CONFIGURED - Using postal code lookup only")
             self.gmaps = None
             self.geolocator = None
+            self.rate_limited_geocode = None
             return
 
         try:
             self.gmaps = googlemaps.Client(key=self.google_api_key)
             self.geolocator = GoogleV3(api_key=self.google_api_key)
+            # Thread-safe throttle shared by all callers; errors still surface to geocode_by_address
+            self.rate_limited_geocode = RateLimiter(
+                self.geolocator.geocode,
+                min_delay_seconds=GEOCODING_MIN_DELAY_SECONDS,
+                max_retries=0,
+                swallow_exceptions=False
+            )
             logger.info("Google Maps API: CONFIGURED AND ENABLED")
         except Exception as e:
             logger.error(f"Google Maps API: FAILED - {e}")
             self.gmaps = None
             self.geolocator = None
+            self.rate_limited_geocode = None
+
+    def _initialize_address_cache(self):
+        """Set up the address geocode cache: bounded in-memory LRU plus optional disk layer"""
+        self.address_cache = OrderedDict()
+        self.address_cache_lock = threading.Lock()
+        self.disk_cache = None
+
+        if not self.geolocator or not DISKCACHE_SUPPORT:
+            return
+
+        try:
+            self.disk_cache = diskcache.Cache(GEOCODE_CACHE_DIR)
+            logger.info(f"Geocode cache: {GEOCODE_CACHE_DIR} ({len(self.disk_cache)} cached addresses)")
+        except Exception as e:
+            logger.warning(f"Geocode cache unavailable, using memory only: {e}")
+
+    @staticmethod
+    def _address_cache_key(address, country):
+        """Cache key: uppercased address with whitespace collapsed, plus the country bias"""
+        return f"{country or ''}|{' '.join(str(address).upper().split())}"
+
+    def _get_cached_address(self, key):
+        """Look up a cached (lat, lng), promoting disk hits into memory"""
+        with self.address_cache_lock:
+            if key in self.address_cache:
+                self.address_cache.move_to_end(key)
+                return self.address_cache[key]
+
+        if self.disk_cache is not None:
+            try:
+                coords = self.disk_cache.get(key)
+            except Exception as e:
+                logger.warning(f"Geocode cache read failed: {e}")
+                coords = None
+            if coords is not None:
+                self._remember_address(key, coords)
+                return coords
+
+        return None
+
+    def _remember_address(self, key, coords):
+        """Store a successful geocode in the in-memory LRU"""
+        with self.address_cache_lock:
+            self.address_cache[key] = coords
+            self.address_cache.move_to_end(key)
+            if len(self.address_cache) > GEOCODE_MEMORY_CACHE_SIZE:
+                self.address_cache.popitem(last=False)
+
+    def _cache_address(self, key, coords):
+        """Store a successful geocode in memory and on disk"""
+        self._remember_address(key, coords)
+        if self.disk_cache is not None:
+            try:
+                self.disk_cache.set(key, coords, expire=GEOCODE_CACHE_TTL_SECONDS)
+            except Exception as e:
+                logger.warning(f"Geocode cache write failed: {e}")
+
+    def _count(self, stat, amount=1):
+        """Increment a geocoding stat (safe across worker threads)"""
+        with self.stats_lock:
+            self.geocode_stats[stat] += amount
     
-    def geocode_by_postal_code(self, postal_code):
-        """Get coordinates by postal code lookup"""
+    @staticmethod
+    def normalize_postal_code(postal_code):
+        """Normalize a postal code to the 6-digit lookup key, or None if unusable"""
+        # Most values are already clean 6-digit strings: use them as the key directly
+        if isinstance(postal_code, str) and len(postal_code) == 6 and postal_code.isascii() and postal_code.isdigit():
+            return postal_code
+
         if not postal_code or str(postal_code).strip() in ('None', '', 'nan'):
-            return None, None
-        
+            return None
+
         try:
             # Normalize postal code to 6-digit format with leading zeros
             postal_code_str = str(postal_code).strip()
             # Handle Singapore postal codes with 'S' prefix
             if postal_code_str.upper().startswith('S') and len(postal_code_str) > 1:
                 postal_code_str = postal_code_str[1:]  # Remove 'S' prefix
-            postal_code_normalized = f"{int(float(postal_code_str)):06d}"
-            
-            if postal_code_normalized in self.postal_code_lookup:
-                self.geocode_stats['postal_matches'] += 1
-                lat, lng = self.postal_code_lookup[postal_code_normalized]
-                return lat, lng
+            return f"{int(float(postal_code_str)):06d}"
         except (ValueError, TypeError, AttributeError) as e:
             # Log invalid postal code format for debugging
             logger.warning(f"Invalid postal code format: {postal_code} - {e}")
-        
+            return None
+
+    @staticmethod
+    def normalize_postal_codes(postal_codes):
+        """Vectorized normalize_postal_code over a Series (None where unusable)"""
+        present = postal_codes.notna()
+        text = postal_codes.astype(object).where(present, '').astype(str).str.strip()
+
+        # Handle Singapore postal codes with 'S' prefix
+        has_prefix = text.str.upper().str.startswith('S') & (text.str.len() > 1)
+        text = text.where(~has_prefix, text.str[1:])
+
+        # Plain digit strings just need zero-padding; falsy zeros never had a lookup key
+        plain = present & text.str.fullmatch(r'[0-9]{1,6}') & ~postal_codes.eq(0)
+        normalized = pd.Series([None] * len(postal_codes), index=postal_codes.index, dtype=object)
+        normalized[plain] = text[plain].str.zfill(6)
+
+        # Anything unusual (floats, long codes, junk) goes through the scalar path
+        unusual = present & ~plain
+        if unusual.any():
+            normalized[unusual] = postal_codes[unusual].map(GeocodingService.normalize_postal_code)
+        return normalized
+
+    def geocode_by_postal_code(self, postal_code):
+        """Get coordinates by postal code lookup"""
+        postal_code_normalized = self.normalize_postal_code(postal_code)
+
+        if postal_code_normalized in self.postal_code_lookup:
+            self._count('postal_matches')
+            lat, lng = self.postal_code_lookup[postal_code_normalized]
+            return lat, lng
+
         return None, None
+
+    def geocode_by_postal_codes(self, postal_codes):
+        """
+        Vectorized geocode_by_postal_code: one join against the lookup table.
+
+        Returns (latitudes, longitudes) Series aligned to postal_codes, NaN where not found.
+        """
+        # Rows often share a postal code (chains, same building): resolve each distinct value once
+        codes, uniques = pd.factorize(postal_codes)
+        normalized = self.normalize_postal_codes(pd.Series(uniques, dtype=object))
+        unique_coords = _load_postal_code_lookup_frame_once().reindex(normalized.tolist()).to_numpy()
+
+        # Map back onto rows; missing postal codes (factorize code -1) stay NaN
+        coords = np.full((len(codes), 2), np.nan)
+        present = codes >= 0
+        coords[present] = unique_coords[codes[present]]
+        latitudes = pd.Series(coords[:, 0], index=postal_codes.index)
+        longitudes = pd.Series(coords[:, 1], index=postal_codes.index)
+
+        self._count('postal_matches', int(latitudes.notna().sum()))
+        return latitudes, longitudes
     
     def geocode_by_address(self, address, country=None):
         """Get coordinates by Google Maps API using full address
@@ -346,8 +615,15 @@ class GeocodingService:
         if not address or str(address).strip() in ('', 'None', 'nan') or not self.geolocator:
             return None, None
 
+        # Only successful lookups are cached, so failures are retried on the next upload
+        cache_key = self._address_cache_key(address, country)
+        cached = self._get_cached_address(cache_key)
+        if cached is not None:
+            self._count('cache_hits')
+            return cached
+
         try:
-            self.geocode_stats['api_calls'] += 1
+            self._count('api_calls')
 
             # Clean address and detect country
             address_str = str(address).strip()
@@ -390,22 +666,42 @@ class GeocodingService:
 
             # Call geocoder with region parameter if available
             if region:
-                location = self.geolocator.geocode(address_str, timeout=10, region=region)
+                location = self.rate_limited_geocode(address_str, timeout=10, region=region)
                 logger.debug(f"Geocoding with region bias: {region.upper()} for address: {address_str}")
             else:
-                location = self.geolocator.geocode(address_str, timeout=10)
+                location = self.rate_limited_geocode(address_str, timeout=10)
 
             if location:
-                return location.latitude, location.longitude
+                coords = (location.latitude, location.longitude)
+                self._cache_address(cache_key, coords)
+                return coords
             else:
-                self.geocode_stats['failures'] += 1
+                self._count('failures')
                 return None, None
 
         except Exception as e:
-            self.geocode_stats['failures'] += 1
+            self._count('failures')
             logger.warning(f"Address geocoding failed for '{address}': {e}")
             return None, None
     
+    def geocode_by_addresses(self, addresses, countries):
+        """
+        Geocode many addresses via Google Maps API, in parallel when available.
+
+        Each distinct (address, country) pair is requested once.
+        Returns {(address, country): (lat, lng)}.
+        """
+        unique_pairs = list(dict.fromkeys(zip(addresses, countries)))
+
+        if CONCURRENT_SUPPORT and len(unique_pairs) > 1:
+            max_workers = min(GEOCODING_MAX_WORKERS, len(unique_pairs))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(lambda pair: self.geocode_by_address(*pair), unique_pairs))
+        else:
+            results = [self.geocode_by_address(address, country=country) for address, country in unique_pairs]
+
+        return dict(zip(unique_pairs, results))
+
     def geocode(self, postal_code, address, country=None):
         """Main geocoding method: country-aware geocoding strategy
 
@@ -444,7 +740,22 @@ class GeocodingService:
     
     def get_stats(self):
         """Get geocoding statistics"""
-        return self.geocode_stats.copy()
+        with self.stats_lock:
+            return self.geocode_stats.copy()
+
+# Shared geocoding services, one per use_google_api setting, created on first use
+_GEOCODERS = {}
+_GEOCODERS_LOCK = threading.Lock()
+
+def get_geocoder(use_google_api=True):
+    """Get the process-wide GeocodingService for the given API preference"""
+    use_google_api = bool(use_google_api)
+    with _GEOCODERS_LOCK:
+        geocoder = _GEOCODERS.get(use_google_api)
+        if geocoder is None:
+            geocoder = GeocodingService(use_google_api=use_google_api)
+            _GEOCODERS[use_google_api] = geocoder
+        return geocoder
 
 class ExcelTransformer:
     @staticmethod
@@ -457,6 +768,10 @@ class ExcelTransformer:
         4. ZONE and ESTATE columns present
         """
         try:
+            # Check row 1 headers and row 2 sub-headers first: cheap, and rules out most sheets
+            if not ExcelTransformer.has_alliance_tokio_headers(ws):
+                return False
+
             # Check for merged cells pattern
             has_operating_hours_merge = False
             for merged_range in ws.merged_cells.ranges:
@@ -465,26 +780,7 @@ class ExcelTransformer:
                     has_operating_hours_merge = True
                     break
 
-            # Check row 1 headers
-            row1 = [cell.value for cell in ws[1]]
-            has_postal_code = any(
-                'POSTAL' in str(h).upper() for h in row1 if h
-            )
-            has_zone_estate = (
-                any('ZONE' in str(h).upper() for h in row1 if h) and
-                any('ESTATE' in str(h).upper() for h in row1 if h)
-            )
-
-            # Check row 2 sub-headers
-            row2 = [cell.value for cell in ws[2]]
-            has_mon_fri_subheader = any('MON - FRI' in str(h) for h in row2 if h)
-
-            is_alliance_tokio = (
-                has_operating_hours_merge and
-                has_postal_code and
-                has_zone_estate and
-                has_mon_fri_subheader
-            )
+            is_alliance_tokio = has_operating_hours_merge
 
             if is_alliance_tokio:
                 logger.info("Detected Alliance-Tokio Marine format (multi-level headers with merged cells)")
@@ -523,6 +819,30 @@ class ExcelTransformer:
 
         return ws
 
+    @staticmethod
+    def has_alliance_tokio_headers(ws):
+        """
+        Header-row part of detect_alliance_tokio_format (rows 1-2 only).
+
+        Only reads cell values, so it also works on read-only worksheets, where
+        merged cell ranges are not available.
+        """
+        if hasattr(ws, 'reset_dimensions'):
+            # Read-only sheets trust the stored <dimension> tag, which third-party writers
+            # often leave missing or wrong; clear it so the header rows are read in full
+            ws.reset_dimensions()
+        rows = list(ws.iter_rows(min_row=1, max_row=2, values_only=True))
+        row1 = rows[0] if rows else ()
+        row2 = rows[1] if len(rows) > 1 else ()
+
+        has_postal_code = any('POSTAL' in str(h).upper() for h in row1 if h)
+        has_zone_estate = (
+            any('ZONE' in str(h).upper() for h in row1 if h) and
+            any('ESTATE' in str(h).upper() for h in row1 if h)
+        )
+        has_mon_fri_subheader = any('MON - FRI' in str(h) for h in row2 if h)
+        return has_postal_code and has_zone_estate and has_mon_fri_subheader
+
     @staticmethod
     def get_alliance_tokio_headers(ws):
         """
@@ -617,7 +937,17 @@ class ExcelTransformer:
 
     @staticmethod
     def safe_read_excel(file_path, sheet_name=None, **kwargs):
-        """Safely read Excel file with fallback for corrupted XML metadata"""
+        """Safely read Excel file with fallback for corrupted XML metadata
+
+        file_path may also be an open pd.ExcelFile, which is parsed with its own engine.
+        """
+        if (EXCEL_READ_ENGINE == 'calamine' and CALAMINE_SUPPORT and 'engine' not in kwargs
+                and not isinstance(file_path, pd.ExcelFile)):
+            try:
+                return pd.read_excel(file_path, sheet_name=sheet_name, engine='calamine', **kwargs)
+            except Exception as e:
+                logger.warning(f"calamine could not read {os.path.basename(file_path)}, falling back to default engine: {e}")
+
         try:
             # First attempt: Normal read
             return pd.read_excel(file_path, sheet_name=sheet_name, **kwargs)
@@ -659,10 +989,39 @@ class ExcelTransformer:
     @staticmethod
     def find_header_row(file_path, sheet_name=None):
         """Find the actual header row by looking for clinic-related keywords"""
-        df_raw = ExcelTransformer.safe_read_excel(file_path, sheet_name=sheet_name, header=None)
+        df_raw = ExcelTransformer.safe_read_excel(file_path, sheet_name=sheet_name, header=None, nrows=HEADER_SCAN_ROWS)
+        return ExcelTransformer.detect_header_row(df_raw)
 
-        for idx, row in df_raw.iterrows():
-            row_values = [str(val) for val in row.values if pd.notna(val)]
+    @staticmethod
+    def read_sheet_with_detected_header(file_path, sheet_name=None, dtype_backend=None):
+        """
+        Read a sheet once and parse it from its detected header row.
+
+        Equivalent to find_header_row followed by safe_read_excel(header=header_row),
+        without parsing the workbook twice. Returns (DataFrame, header_row).
+        """
+        # dtype=object keeps the raw cell values, so type inference below matches a header read
+        df_raw = ExcelTransformer.safe_read_excel(file_path, sheet_name=sheet_name, header=None, dtype=object)
+        header_row = ExcelTransformer.detect_header_row(df_raw.head(HEADER_SCAN_ROWS))
+
+        if header_row >= len(df_raw):
+            # Let read_excel report (or handle) a header past the end of the sheet
+            read_kwargs = {'dtype_backend': dtype_backend} if dtype_backend else {}
+            return ExcelTransformer.safe_read_excel(file_path, sheet_name=sheet_name, header=header_row, **read_kwargs), header_row
+
+        # Hand the rows back to pandas' parser the way read_excel does: empty cells as ''
+        rows = df_raw.iloc[header_row:]
+        rows = rows.where(rows.notna(), '').values.tolist()
+        parser_kwargs = {'dtype_backend': dtype_backend} if dtype_backend else {}
+        df = TextParser(rows, header=0, skip_blank_lines=False, **parser_kwargs).read()
+        return df, header_row
+
+    @staticmethod
+    def detect_header_row(df_raw):
+        """Find the header row in a sheet read with header=None (falls back to row 4)"""
+        # Plain tuples avoid building a Series per row (header=None gives a RangeIndex)
+        for idx, row in enumerate(df_raw.itertuples(index=False, name=None)):
+            row_values = [str(val) for val in row if pd.notna(val)]
             row_text = ' '.join(row_values).lower()
 
             # Enhanced header detection patterns
@@ -701,8 +1060,8 @@ class ExcelTransformer:
                 return idx
 
         # If no clear header found, look for the first row with substantial data
-        for idx, row in df_raw.iterrows():
-            non_null_count = sum(1 for val in row.values if pd.notna(val) and str(val).strip())
+        for idx, row in enumerate(df_raw.itertuples(index=False, name=None)):
+            non_null_count = sum(1 for val in row if pd.notna(val) and str(val).strip())
             if non_null_count >= 5:  # At least 5 non-empty columns
                 return idx
 
@@ -762,20 +1121,20 @@ class ExcelTransformer:
         return value_str
 
     @staticmethod
-    def extract_terminated_clinic_ids(file_path, termination_sheets):
+    def extract_terminated_clinic_ids(file_path, termination_sheets, excel_file=None):
         """Extract clinic IDs and postal codes from termination sheets
 
         Returns a set of tuples: {(provider_code, postal_code), ...}
         This ensures termination only occurs when BOTH provider code AND postal code match
+        excel_file: optional open pd.ExcelFile for file_path, reused instead of reopening it
         """
         terminated_entries = set()
 
         for sheet in termination_sheets:
             try:
                 # Find header row for termination sheet
-                header_row = ExcelTransformer.find_header_row(file_path, sheet)
-                df = ExcelTransformer.safe_read_excel(file_path, sheet_name=sheet, header=header_row)
-                df.columns = df.columns.str.strip()
+                df, _ = ExcelTransformer.read_sheet_with_detected_header(excel_file if excel_file is not None else file_path, sheet)
+                df.columns = ExcelTransformer.strip_column_names(df.columns)
 
                 # Look for clinic ID/provider code column (various possible names)
                 id_columns = [col for col in df.columns if 'clinic' in col.lower() and 'id' in col.lower()]
@@ -894,39 +1253,66 @@ class ExcelTransformer:
     
     @staticmethod
     def write_excel_with_text_postal_codes(df, file_path):
-        """Write DataFrame to Excel with PostalCode column formatted as text"""
-        from openpyxl import load_workbook
-        from openpyxl.styles import numbers
-        
-        # Write the DataFrame to Excel
-        df.to_excel(file_path, index=False, engine='openpyxl')
-        
-        # Open the workbook and apply text formatting to PostalCode column
-        if 'PostalCode' in df.columns:
-            wb = load_workbook(file_path)
-            ws = wb.active
-            
-            # Find the PostalCode column index
-            postal_col_idx = None
-            for idx, cell in enumerate(ws[1], start=1):
-                if cell.value == 'PostalCode':
-                    postal_col_idx = idx
-                    break
-            
-            if postal_col_idx:
-                # Apply text format to the entire PostalCode column
-                for row in range(2, ws.max_row + 1):
-                    cell = ws.cell(row=row, column=postal_col_idx)
-                    cell.number_format = '@'  # '@' is the Excel format code for text
-            
-            wb.save(file_path)
-        
+        """Write DataFrame to Excel with PostalCode column formatted as text
+
+        Uses xlsxwriter in constant_memory mode so rows are streamed to disk
+        instead of building a full openpyxl workbook and re-opening it to
+        apply the PostalCode text format.
+        """
+        import xlsxwriter
+
+        # Datetimes keep the readable format the openpyxl writer gave them
+        workbook = xlsxwriter.Workbook(file_path, {
+            'constant_memory': True,
+            'strings_to_urls': False,
+            'default_date_format': 'yyyy-mm-dd hh:mm:ss',
+        })
+        try:
+            worksheet = workbook.add_worksheet('Sheet1')
+
+            # Same header style pandas applies in to_excel
+            header_format = workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
+
+            # Column formats must be set before any rows are flushed
+            if 'PostalCode' in df.columns:
+                postal_col_idx = df.columns.get_loc('PostalCode')
+                text_format = workbook.add_format({'num_format': '@'})  # '@' is the Excel format code for text
+                worksheet.set_column(postal_col_idx, postal_col_idx, None, text_format)
+
+            worksheet.write_row(0, 0, [str(col) for col in df.columns], header_format)
+
+            # constant_memory only keeps the current row, so write row by row
+            # (pandas' to_excel writes column by column and would drop data)
+            for row_idx, row in enumerate(df.itertuples(index=False, name=None), start=1):
+                for col_idx, value in enumerate(row):
+                    if value is None or pd.isna(value):
+                        continue
+                    if isinstance(value, (float, np.floating)) and np.isinf(value):
+                        # xlsxwriter rejects inf; write it as text like to_excel's inf_rep did
+                        value = 'inf' if value > 0 else '-inf'
+                    worksheet.write(row_idx, col_idx, value)
+        finally:
+            workbook.close()
+
         return file_path
 
 
+    @staticmethod
+    def strip_column_names(columns):
+        """Strip whitespace from string headers; non-string headers become NaN like Index.str.strip()"""
+        # A plain comprehension over a few dozen labels skips the StringMethods dispatch.
+        # np.char.strip would need astype(str), turning NaN headers into 'nan' labels.
+        return pd.Index([col.strip() if isinstance(col, str) else np.nan for col in columns], dtype=object)
+
     @staticmethod
     def map_columns(df_columns):
         """Robust column mapping with fuzzy matching and multiple file format support"""
+        # Sheets with the same header reuse the cached mapping; copy so callers can't mutate it
+        return dict(ExcelTransformer._map_columns_cached(tuple(df_columns)))
+
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def _map_columns_cached(df_columns):
         import re
         from difflib import get_close_matches
 
@@ -1192,8 +1578,8 @@ class ExcelTransformer:
                     'johor bahru', 'kl', 'shah alam', 'petaling jaya', 'bandar', 'taman'
                 ]
                 # Also check for Malaysian postal code patterns (5 digits vs Singapore's 6)
-                has_5_digit = bool(re.search(r'\b\d{5}\b', address_str))
-                has_6_digit = bool(re.search(r'\b\d{6}\b', address_str))
+                has_5_digit = bool(_FIVE_DIGIT_RE.search(address_str))
+                has_6_digit = bool(_SIX_DIGIT_RE.search(address_str))
 
                 is_malaysian = any(indicator in address_lower for indicator in malaysian_indicators)
                 # If we find 5-digit codes but no 6-digit codes, likely Malaysian
@@ -1204,31 +1590,18 @@ class ExcelTransformer:
 
         if country == 'SINGAPORE':
             # Singapore: Look for SINGAPORE followed by 6 digits
-            match = re.search(r'SINGAPORE\s+(\d{6})', address_str, re.IGNORECASE)
+            match = _POSTAL_RE.search(address_str)
             if match:
                 return match.group(1)
             # Fallback: Look for 6-digit patterns in Singapore addresses
-            matches = re.findall(r'\b(\d{6})\b', address_str)
+            matches = _SIX_DIGIT_RE.findall(address_str)
             return matches[-1] if matches else None  # Return last 6-digit number found
 
         elif country == 'MALAYSIA':
             # Malaysia: Look for 5-digit postal codes in various formats
             # Use multiple patterns to catch different formats
-            patterns = [
-                # Pattern 1: Standalone 5-digit codes (81300 SKUDAI, JOHOR)
-                r'\b(\d{5})\b',
-                # Pattern 2: City followed by postal code (KULAI 81000)
-                r'\b[A-Za-z\s]+\s+(\d{5})',
-                # Pattern 3: Postal code at end (TAMAN PERLING, 81200)
-                r',\s*(\d{5})\s*$',
-                # Pattern 4: Postal code before end tokens
-                r'(\d{5})(?=\s*(?:$|,|\s+(?:JOHOR|SELANGOR|MALAYSIA)))',
-                # Pattern 5: Any 5-digit sequence (most permissive)
-                r'(\d{5})'
-            ]
-
-            for pattern in patterns:
-                matches = re.findall(pattern, address_str, re.IGNORECASE)
+            for pattern in _MALAYSIA_POSTAL_RES:
+                matches = pattern.findall(address_str)
                 if matches:
                     # Return the first match found
                     return matches[0]
@@ -1245,6 +1618,44 @@ class ExcelTransformer:
             return f"{phone_str} - {remarks_str}"
         return phone_str
 
+    @staticmethod
+    def _as_text(series, default=''):
+        """Vectorized `str(value) if pd.notna(value) else default` over a Series"""
+        return series.astype(object).where(series.notna(), default).astype(str)
+
+    @staticmethod
+    def extract_postal_codes(addresses):
+        """
+        Vectorized extract_postal_code for a Series of address strings.
+
+        Addresses containing "SINGAPORE <6 digits>" resolve in a single regex pass;
+        only the remainder go through the full per-address country detection.
+        Returns an object Series with None where no postal code was found.
+        """
+        codes = addresses.str.extract(_POSTAL_RE, expand=False)
+        misses = codes.isna() | ~addresses.str.lower().str.contains('singapore', regex=False, na=False)
+        if misses.any():
+            # Residual addresses repeat across branches/rows: parse each distinct one once.
+            # factorize marks missing values -1, which picks the trailing None.
+            positions, uniques = pd.factorize(addresses[misses])
+            parsed = np.array([ExcelTransformer.extract_postal_code(address) for address in uniques] + [None], dtype=object)
+            codes = codes.astype(object)
+            codes[misses] = parsed[positions]
+        return codes.astype(object).where(codes.notna(), None)
+
+    @staticmethod
+    def combine_phone_remarks_series(phone, remarks):
+        """Vectorized combine_phone_remarks over aligned phone and remarks Series"""
+        phone_str = ExcelTransformer._as_text(phone)
+        remarks_str = ExcelTransformer._as_text(remarks)
+
+        has_remarks = remarks_str.ne('') & remarks_str.str.lower().ne('nan')
+        return pd.Series(
+            np.where(has_remarks, phone_str + ' - ' + remarks_str, phone_str),
+            index=phone.index,
+            dtype=object
+        )
+
     @staticmethod
     def _is_truly_empty(value):
         """
@@ -1501,70 +1912,53 @@ class ExcelTransformer:
             'public_holiday': 'publicday'
         }
 
-        result = []
-        for idx, row in df_source.iterrows():
-            current_result = None
+        # Only use complex format if we have multiple time periods (AM/PM/Night)
+        complex_keys_found = [key for key in complex_keys if key in col_map]
+        has_complex = len(complex_keys_found) > 1
 
-            # Strategy 1: Try complex format (AM/PM/NIGHT columns)
+        if has_complex:
+            # Strategy 1: Use complex format, missing periods count as CLOSED
             am_key, pm_key, night_key = complex_keys
-            # Only use complex format if we have multiple time periods (AM/PM/Night)
-            complex_keys_found = [key for key in complex_keys if key in col_map]
-            has_complex = len(complex_keys_found) > 1
-
-            if has_complex:
-                # Use complex format
-                am = row.get(col_map.get(am_key, ''), 'CLOSED') if am_key in col_map else 'CLOSED'
-                pm = row.get(col_map.get(pm_key, ''), 'CLOSED') if pm_key in col_map else 'CLOSED'
-                night = row.get(col_map.get(night_key, ''), 'CLOSED') if night_key in col_map else 'CLOSED'
-
-                # Handle NaN values
-                am = 'CLOSED' if pd.isna(am) else str(am)
-                pm = 'CLOSED' if pd.isna(pm) else str(pm)
-                night = 'CLOSED' if pd.isna(night) else str(night)
-
-                current_result = f"{am}/{pm}/{night}"
+            periods = [
+                ExcelTransformer._as_text(df_source[col_map[key]], 'CLOSED') if key in col_map else 'CLOSED'
+                for key in (am_key, pm_key, night_key)
+            ]
+            result = periods[0] + '/' + periods[1] + '/' + periods[2]
+        else:
+            # Strategy 2: Use simple format - check any available key
+            found_key = next((key for key in [simple_key] + list(complex_keys) if key in col_map), None)
 
+            if found_key:
+                # For SP clinic format, use clean hours without /CLOSED/CLOSED suffix
+                result = ExcelTransformer._as_text(df_source[col_map[found_key]], 'CLOSED')
             else:
-                # Strategy 2: Use simple format - check any available key
-                hours_str = 'CLOSED'
-                found_key = False
-                for key_to_check in [simple_key] + list(complex_keys):
-                    if key_to_check in col_map:
-                        hours_value = row.get(col_map[key_to_check], 'CLOSED')
-                        hours_str = 'CLOSED' if pd.isna(hours_value) else str(hours_value)
-                        found_key = True
-                        break
-
-                if found_key:
-                    # For SP clinic format, use clean hours without /CLOSED/CLOSED suffix
-                    current_result = hours_str
-                else:
-                    # Strategy 3: No mapping found, default to CLOSED
-                    current_result = 'CLOSED'
+                # Strategy 3: No mapping found, default to CLOSED
+                result = pd.Series('CLOSED', index=df_source.index, dtype=object)
 
-            # NEW: Strategy 4 - Fallback to remarks if day column is truly empty
-            if ExcelTransformer._is_truly_empty(current_result) and 'remarks' in col_map:
-                remarks = row.get(col_map['remarks'], None)
-                if pd.notna(remarks):
-                    try:
-                        extracted = ExcelTransformer.extract_hours_from_remarks(remarks)
-
-                        if day_type in fallback_map:
-                            fallback_value = extracted.get(fallback_map[day_type])
-                            if fallback_value:
-                                # Day mentioned in remarks - use extracted value
-                                current_result = fallback_value
-                                logger.debug(f"Row {idx}: Used remarks fallback for {day_type} - extracted: {fallback_value}")
-                            else:
-                                # Day NOT mentioned in remarks - set to CLOSED
-                                current_result = 'CLOSED'
-                                logger.debug(f"Row {idx}: Day {day_type} not found in remarks - setting to CLOSED")
-                    except Exception as e:
-                        logger.warning(f"Row {idx}: Remarks extraction failed for {day_type}: {e}")
+        # NEW: Strategy 4 - Fallback to remarks if day column is truly empty
+        if 'remarks' in col_map:
+            result = result.astype(object)
+            remarks_col = df_source[col_map['remarks']]
+            empty_mask = result.str.strip().str.lower().isin(('', 'nan', 'none')) & remarks_col.notna()
 
-            result.append(current_result)
+            for idx, remarks in remarks_col[empty_mask].items():
+                try:
+                    extracted = ExcelTransformer.extract_hours_from_remarks(remarks)
+
+                    if day_type in fallback_map:
+                        fallback_value = extracted.get(fallback_map[day_type])
+                        if fallback_value:
+                            # Day mentioned in remarks - use extracted value
+                            result.at[idx] = fallback_value
+                            logger.debug(f"Row {idx}: Used remarks fallback for {day_type} - extracted: {fallback_value}")
+                        else:
+                            # Day NOT mentioned in remarks - set to CLOSED
+                            result.at[idx] = 'CLOSED'
+                            logger.debug(f"Row {idx}: Day {day_type} not found in remarks - setting to CLOSED")
+                except Exception as e:
+                    logger.warning(f"Row {idx}: Remarks extraction failed for {day_type}: {e}")
 
-        return result
+        return result.tolist()
 
     @staticmethod
     def construct_address(df_source, col_map):
@@ -1650,11 +2044,15 @@ class ExcelTransformer:
         return [''] * len(df_source)
 
     @staticmethod
-    def transform_sheet(input_path, sheet_name, terminated_ids=None, use_google_api=True):
-        """Transform a single sheet to target template format with geocoding"""
+    def transform_sheet(input_path, sheet_name, terminated_ids=None, use_google_api=True, workbook=None, excel_file=None):
+        """Transform a single sheet to target template format with geocoding
+
+        workbook / excel_file: optional read-only openpyxl workbook and pd.ExcelFile already
+        opened for input_path by the calling thread; both are only read, never modified.
+        """
         try:
             # Initialize geocoding service with user preference
-            geocoding_service = GeocodingService(use_google_api=use_google_api)
+            geocoding_service = get_geocoder(use_google_api)
 
             # Check if this is Alliance-Tokio Marine format
             # Note: Only .xlsx files support Alliance-Tokio format (uses merged cells)
@@ -1662,10 +2060,31 @@ class ExcelTransformer:
             file_extension = os.path.splitext(input_path)[1].lower()
 
             if file_extension == '.xlsx':
-                # Only check for Alliance-Tokio format in .xlsx files
-                wb = load_workbook_safe(input_path)
-                ws = wb[sheet_name]
-                is_alliance_tokio = ExcelTransformer.detect_alliance_tokio_format(ws)
+                # Only check for Alliance-Tokio format in .xlsx files. The header rows of a
+                # read-only workbook rule out most sheets before the full load that
+                # merged-cell detection (and unmerging) needs.
+                if workbook is not None:
+                    has_headers = ExcelTransformer.has_alliance_tokio_headers(workbook[sheet_name])
+                else:
+                    # No workbook from the caller (e.g. sheets on worker threads): open our own
+                    try:
+                        header_workbook = load_workbook_safe(input_path, read_only=True)
+                    except Exception as e:
+                        # Let the full load below decide, as it did before the pre-check existed
+                        logger.warning(f"Read-only header check failed for sheet '{sheet_name}': {e}")
+                        has_headers = True
+                    else:
+                        try:
+                            has_headers = ExcelTransformer.has_alliance_tokio_headers(header_workbook[sheet_name])
+                        finally:
+                            header_workbook.close()
+
+                if has_headers:
+                    wb = load_workbook_safe(input_path)
+                    ws = wb[sheet_name]
+                    is_alliance_tokio = ExcelTransformer.detect_alliance_tokio_format(ws)
+                else:
+                    is_alliance_tokio = False
             else:
                 # Legacy .xls files don't support Alliance-Tokio merged cell format
                 is_alliance_tokio = False
@@ -1694,15 +2113,11 @@ class ExcelTransformer:
 
                 header_row = None  # Already handled
             else:
-                # Standard format - find the correct header row
-                header_row = ExcelTransformer.find_header_row(input_path, sheet_name)
-
-                # Read the source sheet
-                df_source = ExcelTransformer.safe_read_excel(input_path, sheet_name=sheet_name, header=header_row)
-                df_source.columns = df_source.columns.str.strip()
-            
-            # Create transformed dataframe
-            df_transformed = pd.DataFrame()
+                # Standard format - find the correct header row and read the source sheet in one pass
+                dtype_backend = 'pyarrow' if EXCEL_DTYPE_BACKEND == 'pyarrow' and PYARROW_SUPPORT else None
+                source = excel_file if excel_file is not None else input_path
+                df_source, header_row = ExcelTransformer.read_sheet_with_detected_header(source, sheet_name, dtype_backend=dtype_backend)
+                df_source.columns = ExcelTransformer.strip_column_names(df_source.columns)
             
             # Map columns flexibly
             col_map = ExcelTransformer.map_columns(df_source.columns)
@@ -1754,22 +2169,26 @@ class ExcelTransformer:
             if initial_count != filtered_count:
                 logger.info(f"Filtered out {initial_count - filtered_count} empty/invalid rows from sheet '{sheet_name}', keeping {filtered_count} valid records")
 
+            # Output columns are collected here and the transformed dataframe is built once
+            # (lists are positional, Series align on df_source's index)
+            columns = {}
+
             # Robust field mapping with fallbacks
             # Clinic ID with smart fallback
             if 'clinic_id' in col_map:
-                df_transformed['Code'] = df_source[col_map['clinic_id']]
+                columns['Code'] = df_source[col_map['clinic_id']]
                 # If Code column contains zone names instead of real IDs, replace with sequential S/N
                 _zone_kw = {'NORTH', 'SOUTH', 'EAST', 'WEST', 'CENTRAL', 'NORTHEAST', 'NORTHWEST', 'SOUTHEAST', 'SOUTHWEST'}
-                _code_vals = df_transformed['Code'].dropna().astype(str).str.upper().str.strip()
-                if len(_code_vals) > 0 and _code_vals.apply(lambda v: v in _zone_kw).mean() > 0.5:
-                    df_transformed['Code'] = range(1, len(df_transformed) + 1)
-                    logger.info(f"Code column detected as zone values — replaced with sequential S/N 1-{len(df_transformed)}")
+                _code_vals = columns['Code'].dropna().astype(str).str.upper().str.strip()
+                if len(_code_vals) > 0 and _code_vals.isin(_zone_kw).mean() > 0.5:
+                    columns['Code'] = list(range(1, len(df_source) + 1))
+                    logger.info(f"Code column detected as zone values — replaced with sequential S/N 1-{len(df_source)}")
             else:
-                df_transformed['Code'] = ExcelTransformer.smart_column_fallback(df_source, col_map, 'clinic_id')
+                columns['Code'] = ExcelTransformer.smart_column_fallback(df_source, col_map, 'clinic_id')
                 logger.info(f"Generated auto clinic IDs for {len(df_source)} records")
 
             # Deduplicate clinic codes: append -1, -2, -3 for all instances of duplicates
-            _code_series = df_transformed['Code'].apply(
+            _code_series = pd.Series(columns['Code'], dtype=object).map(
                 lambda v: str(v).strip() if pd.notna(v) and v is not None else None
             )
             _code_value_counts = _code_series.value_counts()
@@ -1785,98 +2204,96 @@ class ExcelTransformer:
                         _new_codes.append(f"{val}-{_dup_tracker[val]}")
                     else:
                         _new_codes.append(val)
-                df_transformed['Code'] = _new_codes
+                columns['Code'] = _new_codes
                 logger.info(f"Deduplicated {len(_dup_codes)} clinic codes with suffixes")
 
             # Clinic Name (required field)
-            df_transformed['Name'] = df_source[col_map['clinic_name']]
+            columns['Name'] = df_source[col_map['clinic_name']]
 
             # Region with smart fallback
             if 'region' in col_map:
-                df_transformed['Zone'] = df_source[col_map['region']]
+                columns['Zone'] = df_source[col_map['region']]
             else:
-                df_transformed['Zone'] = ExcelTransformer.smart_column_fallback(df_source, col_map, 'region')
+                columns['Zone'] = ExcelTransformer.smart_column_fallback(df_source, col_map, 'region')
 
             # Area with smart fallback
             if 'area' in col_map:
-                df_transformed['Area'] = df_source[col_map['area']]
+                columns['Area'] = df_source[col_map['area']]
             else:
-                df_transformed['Area'] = ExcelTransformer.smart_column_fallback(df_source, col_map, 'area')
+                columns['Area'] = ExcelTransformer.smart_column_fallback(df_source, col_map, 'area')
 
             # Specialty field (available in SP clinic sheets)
             if 'specialty' in col_map:
-                df_transformed['Specialty'] = df_source[col_map['specialty']]
+                columns['Specialty'] = df_source[col_map['specialty']]
             else:
-                df_transformed['Specialty'] = None
+                columns['Specialty'] = None
 
             # Doctor field (available in TCM and SP clinic sheets)
             if 'doctor_name' in col_map:
-                df_transformed['Doctor'] = df_source[col_map['doctor_name']]
+                columns['Doctor'] = df_source[col_map['doctor_name']]
             else:
-                df_transformed['Doctor'] = None
+                columns['Doctor'] = None
 
             # Smart address construction
-            df_transformed['Address1'] = ExcelTransformer.construct_address(df_source, col_map)
+            columns['Address1'] = ExcelTransformer.construct_address(df_source, col_map)
 
             # Extract Address2 and Address3 from source data if available
             if 'address2' in col_map:
-                df_transformed['Address2'] = df_source[col_map['address2']].fillna('')
+                columns['Address2'] = df_source[col_map['address2']].fillna('')
             else:
-                df_transformed['Address2'] = None
+                columns['Address2'] = None
 
             if 'address3' in col_map:
-                df_transformed['Address3'] = df_source[col_map['address3']].fillna('')
+                columns['Address3'] = df_source[col_map['address3']].fillna('')
             else:
-                df_transformed['Address3'] = None
+                columns['Address3'] = None
 
             # Extract postal codes from addresses (supports both Singapore and Malaysia)
             logger.info("=" * 60)
             logger.info("POSTAL CODE EXTRACTION STARTED")
-            logger.info(f"Total records: {len(df_transformed)}")
+            logger.info(f"Total records: {len(df_source)}")
             logger.info(f"Postal code column mapped: {'postal_code' in col_map}")
             if 'postal_code' in col_map:
                 logger.info(f"  Source column: {col_map['postal_code']}")
             logger.info("=" * 60)
 
-            # Enhanced postal code extraction
-            postal_codes = []
+            # Enhanced postal code extraction (positional, resolved source by source)
+            postal_codes = pd.Series([None] * len(df_source), dtype=object)
             extraction_methods = {'dedicated_column': 0, 'address4': 0, 'address1': 0, 'failed': 0}
 
-            for index, address in enumerate(df_transformed['Address1']):
-                postal_code = None
-                extraction_method = None
-
-                # Try dedicated postal code column first (if it has valid data)
-                if 'postal_code' in col_map:
-                    postal_col_value = df_source.iloc[index][col_map['postal_code']]
-                    if pd.notna(postal_col_value) and str(postal_col_value).strip() not in ('', 'nan', 'None'):
-                        postal_code = str(postal_col_value).strip()
-                        extraction_method = 'dedicated_column'
-
-                # If no valid postal code from dedicated column, extract from address
-                if not postal_code:
-                    # For SP clinic format, check Address4 first (contains "SINGAPORE 247909")
-                    if 'address4' in col_map:
-                        address4_value = df_source.iloc[index].get(col_map['address4'], '')
-                        if pd.notna(address4_value) and str(address4_value).strip():
-                            postal_code = ExcelTransformer.extract_postal_code(str(address4_value))
-                            if postal_code:
-                                extraction_method = 'address4'
-
-                    # Fallback to extracting from combined address
-                    if not postal_code and pd.notna(address) and str(address).strip():
-                        postal_code = ExcelTransformer.extract_postal_code(address)
-                        if postal_code:
-                            extraction_method = 'address1'
-
-                if extraction_method:
-                    extraction_methods[extraction_method] += 1
-                else:
-                    extraction_methods['failed'] += 1
-
-                postal_codes.append(postal_code)
-
-            df_transformed['PostalCode'] = postal_codes
+            # Try dedicated postal code column first (if it has valid data)
+            if 'postal_code' in col_map:
+                postal_col = df_source[col_map['postal_code']].reset_index(drop=True)
+                postal_text = ExcelTransformer._as_text(postal_col).str.strip()
+                from_column = postal_col.notna() & ~postal_text.isin(('', 'nan', 'None'))
+                postal_codes[from_column] = postal_text[from_column]
+                extraction_methods['dedicated_column'] = int(from_column.sum())
+
+            # For SP clinic format, check Address4 next (contains "SINGAPORE 247909")
+            if 'address4' in col_map:
+                address4_col = df_source[col_map['address4']].reset_index(drop=True)
+                address4_text = ExcelTransformer._as_text(address4_col)
+                pending = postal_codes.isna() & address4_col.notna() & address4_text.str.strip().ne('')
+                if pending.any():
+                    extracted = ExcelTransformer.extract_postal_codes(address4_text[pending])
+                    extracted = extracted[extracted.notna()]
+                    postal_codes[extracted.index] = extracted
+                    extraction_methods['address4'] = len(extracted)
+
+            # Fallback to extracting from combined address
+            address1_col = pd.Series(columns['Address1'], dtype=object)
+            address1_text = ExcelTransformer._as_text(address1_col)
+            pending = postal_codes.isna() & address1_col.notna() & address1_text.str.strip().ne('')
+            if pending.any():
+                extracted = ExcelTransformer.extract_postal_codes(address1_text[pending])
+                extracted = extracted[extracted.notna()]
+                postal_codes[extracted.index] = extracted
+                extraction_methods['address1'] = len(extracted)
+
+            extraction_methods['failed'] = int(postal_codes.isna().sum())
+            columns['PostalCode'] = postal_codes.tolist()
+
+            df_transformed = pd.DataFrame(columns, index=df_source.index)
 
             # Log extraction results
             logger.info("=" * 60)
@@ -1895,31 +2312,29 @@ class ExcelTransformer:
                 initial_count = len(df_transformed)
                 clinic_id_col = col_map['clinic_id']
 
-                # Create termination matching mask
-                terminated_mask = []
-                for idx, row in df_transformed.iterrows():
-                    # Normalize provider code and postal code for consistent matching
-                    provider_code = ExcelTransformer.normalize_code(df_source.loc[idx][clinic_id_col])
-                    postal_code = ExcelTransformer.normalize_code(row['PostalCode'])
-
-                    is_terminated = False
-                    if provider_code and postal_code:
-                        # Check for exact match (provider_code, postal_code)
-                        if (provider_code, postal_code) in terminated_ids:
-                            is_terminated = True
-                            if provider_code not in filtered_provider_codes:
-                                filtered_provider_codes.append(provider_code)
-                        # Check for fallback single-parameter match (provider_code, None)
-                        elif (provider_code, None) in terminated_ids:
-                            is_terminated = True
-                            if provider_code not in filtered_provider_codes:
-                                filtered_provider_codes.append(provider_code)
-
-                    terminated_mask.append(is_terminated)
+                # Normalize provider code and postal code for consistent matching
+                provider_codes = df_source[clinic_id_col].map(ExcelTransformer.normalize_code)
+                postal_codes_normalized = df_transformed['PostalCode'].map(ExcelTransformer.normalize_code)
+
+                # Provider codes terminated without a postal code match on provider code alone
+                provider_only_ids = frozenset(code for code, postal in terminated_ids if postal is None)
+
+                # Create termination matching mask: exact (provider_code, postal_code) match,
+                # or fallback single-parameter match (provider_code, None)
+                pair_keys = pd.Series(
+                    list(zip(provider_codes, postal_codes_normalized)),
+                    index=df_transformed.index,
+                    dtype=object
+                )
+                has_both = provider_codes.notna() & postal_codes_normalized.notna()
+                terminated_mask = has_both & (pair_keys.isin(terminated_ids) | provider_codes.isin(provider_only_ids))
+
+                # Preserve first-seen order of filtered provider codes
+                filtered_provider_codes = list(dict.fromkeys(provider_codes[terminated_mask]))
 
                 # Apply filter to both dataframes
-                df_transformed = df_transformed[~pd.Series(terminated_mask, index=df_transformed.index)]
-                df_source = df_source[~pd.Series(terminated_mask, index=df_source.index)]
+                df_transformed = df_transformed[~terminated_mask]
+                df_source = df_source[~terminated_mask]
 
                 # Reset indices
                 df_transformed = df_transformed.reset_index(drop=True)
@@ -1984,34 +2399,27 @@ class ExcelTransformer:
                 return 'SINGAPORE'
 
             # Detect country from combined address fields (Address1, Address2, Address3, PostalCode, Zone, Region, Area)
-            def detect_country_from_row(row):
-                # Combine all address-related fields AND region/zone/area to check for country indicators
-                # This catches cases where "JOHOR" is in Zone/Region but not in the address itself
-                combined_address = ' '.join([
-                    str(row.get('Zone', '')),
-                    str(row.get('Region', '')),
-                    str(row.get('Area', '')),
-                    str(row.get('Address1', '')),
-                    str(row.get('Address2', '')),
-                    str(row.get('Address3', '')),
-                    str(row.get('PostalCode', ''))
-                ])
-                return detect_country(combined_address)
+            # Combine all address-related fields AND region/zone/area to check for country indicators
+            # This catches cases where "JOHOR" is in Zone/Region but not in the address itself
+            combined_address = None
+            for field in ('Zone', 'Region', 'Area', 'Address1', 'Address2', 'Address3', 'PostalCode'):
+                field_text = df_transformed[field].map(str) if field in df_transformed.columns else ''
+                combined_address = field_text if combined_address is None else combined_address + ' ' + field_text
+            countries = combined_address.map(detect_country)
 
-            df_transformed['Country'] = df_transformed.apply(detect_country_from_row, axis=1)
+            # Remaining output columns, appended to the transformed dataframe in one step after geocoding
+            columns = {'Country': countries}
 
             # Combine phone and remarks (if available)
             if 'telephone' in col_map and col_map['telephone'] is not None and pd.notna(col_map['telephone']):
                 if 'remarks' in col_map and col_map['remarks'] is not None:
-                    df_transformed['PhoneNumber'] = df_source.apply(
-                        lambda row: ExcelTransformer.combine_phone_remarks(
-                            row[col_map['telephone']], row[col_map['remarks']]
-                        ), axis=1
+                    columns['PhoneNumber'] = ExcelTransformer.combine_phone_remarks_series(
+                        df_source[col_map['telephone']], df_source[col_map['remarks']]
                     )
                 else:
-                    df_transformed['PhoneNumber'] = df_source[col_map['telephone']].astype(str)
+                    columns['PhoneNumber'] = df_source[col_map['telephone']].astype(str)
             else:
-                df_transformed['PhoneNumber'] = ''
+                columns['PhoneNumber'] = ''
 
             # Operating hours handling
             if is_alliance_tokio:
@@ -2038,16 +2446,16 @@ class ExcelTransformer:
                     sundays.append(sun_result)
                     holidays.append(hol_result)
 
-                df_transformed['MonToFri'] = weekdays
-                df_transformed['Saturday'] = saturdays
-                df_transformed['Sunday'] = sundays
-                df_transformed['PublicHoliday'] = holidays
+                columns['MonToFri'] = weekdays
+                columns['Saturday'] = saturdays
+                columns['Sunday'] = sundays
+                columns['PublicHoliday'] = holidays
             else:
                 # Standard format: flexible mapping
-                df_transformed['MonToFri'] = ExcelTransformer.combine_operating_hours_flexible(df_source, col_map, 'weekday')
-                df_transformed['Saturday'] = ExcelTransformer.combine_operating_hours_flexible(df_source, col_map, 'saturday')
-                df_transformed['Sunday'] = ExcelTransformer.combine_operating_hours_flexible(df_source, col_map, 'sunday')
-                df_transformed['PublicHoliday'] = ExcelTransformer.combine_operating_hours_flexible(df_source, col_map, 'public_holiday')
+                columns['MonToFri'] = ExcelTransformer.combine_operating_hours_flexible(df_source, col_map, 'weekday')
+                columns['Saturday'] = ExcelTransformer.combine_operating_hours_flexible(df_source, col_map, 'saturday')
+                columns['Sunday'] = ExcelTransformer.combine_operating_hours_flexible(df_source, col_map, 'sunday')
+                columns['PublicHoliday'] = ExcelTransformer.combine_operating_hours_flexible(df_source, col_map, 'public_holiday')
             
             # Geocoding: Populate Latitude and Longitude
             logger.info("=" * 60)
@@ -2055,56 +2463,68 @@ class ExcelTransformer:
             logger.info(f"Total records to geocode: {len(df_transformed)}")
             logger.info("=" * 60)
 
-            latitudes = []
-            longitudes = []
-            geocoding_methods = []
-
             # Log sample of postal codes being processed
             sample_size = min(3, len(df_transformed))
             if sample_size > 0:
                 logger.info(f"Sample postal codes extracted:")
-                for i in range(sample_size):
-                    postal = df_transformed.iloc[i]['PostalCode']
-                    addr = df_transformed.iloc[i]['Address1']
+                sample = df_transformed[['PostalCode', 'Address1']].head(sample_size)
+                for i, (postal, addr) in enumerate(sample.itertuples(index=False, name=None)):
                     logger.info(f"  Row {i+1}: PostalCode='{postal}', Address='{addr[:50]}...' " if len(str(addr)) > 50 else f"  Row {i+1}: PostalCode='{postal}', Address='{addr}'")
 
-            for index, row in df_transformed.iterrows():
-                postal_code = row['PostalCode']
-                address = row['Address1']
-                country = row['Country']  # Get country to force region bias for Malaysia
-
-                # Pass country to geocode method to force Malaysia region for Malaysian addresses
-                lat, lng, method = geocoding_service.geocode(postal_code, address, country=country)
-                latitudes.append(lat)
-                longitudes.append(lng)
-                geocoding_methods.append(method)
+            # Postal code lookup for every non-Malaysian row in one vectorized join
+            # (the lookup is Singapore-only, so Malaysian rows go straight to the API)
+            is_malaysia = countries.eq('MALAYSIA')
+            lat_series = pd.Series(np.nan, index=df_transformed.index)
+            lng_series = pd.Series(np.nan, index=df_transformed.index)
+            if (~is_malaysia).any():
+                postal_lat, postal_lng = geocoding_service.geocode_by_postal_codes(df_transformed.loc[~is_malaysia, 'PostalCode'])
+                lat_series[~is_malaysia] = postal_lat
+                lng_series[~is_malaysia] = postal_lng
+
+            geocoding_methods = pd.Series('failed', index=df_transformed.index, dtype=object)
+            geocoding_methods[lat_series.notna()] = 'postal_code'
+
+            # Google Maps API fallback only for the rows the lookup could not resolve
+            unmatched = lat_series.isna()
+            if geocoding_service.use_google_api and unmatched.any():
+                unmatched_rows = pd.DataFrame({'Address1': df_transformed['Address1'], 'Country': countries})[unmatched]
+
+                # Pass country to force Malaysia region for Malaysian addresses
+                geocoded = geocoding_service.geocode_by_addresses(unmatched_rows['Address1'], unmatched_rows['Country'])
+                logger.info(f"Geocoded {len(unmatched_rows)} unmatched records via Google Maps API ({len(geocoded)} distinct addresses)")
+
+                for index, address, country in unmatched_rows.itertuples(name=None):
+                    lat, lng = geocoded[(address, country)]
+                    if lat is not None and lng is not None:
+                        lat_series[index] = lat
+                        lng_series[index] = lng
+                        geocoding_methods[index] = 'address'
+
+            # One notna pass over both coordinate columns, reused for the output and URL mask
+            coords_present = pd.DataFrame({'lat': lat_series, 'lng': lng_series}).notna()
+            latitudes = lat_series.astype(object).where(coords_present['lat'], None).tolist()
+            longitudes = lng_series.astype(object).where(coords_present['lng'], None).tolist()
+
+            columns['Latitude'] = latitudes
+            columns['Longitude'] = longitudes
 
-                # Log progress every 50 records
-                if (index + 1) % 50 == 0:
-                    success_count = sum(1 for l in latitudes if l is not None)
-                    logger.info(f"Geocoding progress: {index + 1}/{len(df_transformed)} records ({success_count} successful)")
-
-            df_transformed['Latitude'] = latitudes
-            df_transformed['Longitude'] = longitudes
-            
             # Generate Google Maps URLs for successfully geocoded locations
-            def generate_google_maps_url(lat, lng):
-                if lat is not None and lng is not None:
-                    return f"https://maps.google.com/?q={lat},{lng}"
-                return None
-            
-            df_transformed['GoogleMapURL'] = df_transformed.apply(
-                lambda row: generate_google_maps_url(row['Latitude'], row['Longitude']), axis=1
+            geocoded_mask = coords_present.all(axis=1)
+            columns['GoogleMapURL'] = np.where(
+                geocoded_mask,
+                'https://maps.google.com/?q=' + lat_series.astype(str) + ',' + lng_series.astype(str),
+                None
             )
+            df_transformed = pd.concat([df_transformed, pd.DataFrame(columns, index=df_transformed.index)], axis=1)
             
             # Return the transformed dataframe instead of saving
             # Saving will be handled by the multi-sheet processor
             
-            # Get geocoding statistics
-            stats = geocoding_service.get_stats()
-            successful_geocodes = sum(1 for lat in latitudes if lat is not None)
-            postal_matches = len([m for m in geocoding_methods if m == 'postal_code'])
-            address_matches = len([m for m in geocoding_methods if m == 'address'])
+            # Get geocoding statistics: every resolved row is tagged 'postal_code' or 'address'
+            method_counts = geocoding_methods.value_counts()
+            postal_matches = int(method_counts.get('postal_code', 0))
+            address_matches = int(method_counts.get('address', 0))
+            successful_geocodes = postal_matches + address_matches
             failed_geocodes = len(df_transformed) - successful_geocodes
             success_rate = (successful_geocodes/len(df_transformed)*100) if len(df_transformed) > 0 else 0
 
@@ -2200,19 +2620,55 @@ class ExcelTransformer:
             logger.info(f"Detected {len(panel_sheets)} panel sheets: {panel_sheets}")
             logger.info(f"Detected {len(termination_sheets)} termination sheets: {termination_sheets}")
 
-            # Extract terminated clinic IDs
-            terminated_ids = ExcelTransformer.extract_terminated_clinic_ids(input_path, termination_sheets)
+            # Open the workbook once and reuse it for the reads made on this thread. With calamine
+            # each read opens its own handle so the calamine engine is actually used.
+            shared_excel_file = None if EXCEL_READ_ENGINE == 'calamine' and CALAMINE_SUPPORT else xl_file
+            # Sheets transformed on worker threads open their own handles: neither pd.ExcelFile
+            # nor openpyxl workbooks are shared between threads
+            run_concurrently = CONCURRENT_SUPPORT and len(panel_sheets) > 1
+            shared_workbook = None
+            try:
+                if panel_sheets and not run_concurrently and os.path.splitext(input_path)[1].lower() == '.xlsx':
+                    # Read-only: only the first two rows of each sheet are inspected for Alliance-Tokio headers
+                    try:
+                        shared_workbook = load_workbook_safe(input_path, read_only=True)
+                    except Exception as e:
+                        # Each sheet then loads its own workbook and fails (or not) on its own
+                        logger.warning(f"Could not open {os.path.basename(input_path)} read-only, loading it per sheet: {e}")
+
+                # Extract terminated clinic IDs once per job; frozen so every sheet shares the same hashed lookup
+                terminated_ids = frozenset(ExcelTransformer.extract_terminated_clinic_ids(
+                    input_path, termination_sheets, excel_file=shared_excel_file
+                ))
+                sheet_excel_file = None if run_concurrently else shared_excel_file
+
+                def transform_panel_sheet(sheet):
+                    logger.info(f"Processing sheet: {sheet}")
+                    # Transform the sheet with geocoding preference
+                    return ExcelTransformer.transform_sheet(
+                        input_path, sheet, terminated_ids, use_google_api,
+                        workbook=shared_workbook, excel_file=sheet_excel_file
+                    )
+
+                # Sheets are independent: one sheet's Google API waits overlap the next sheet's parsing.
+                # Results are still consumed in sheet order, so outputs and totals are unchanged.
+                if run_concurrently:
+                    with ThreadPoolExecutor(max_workers=min(SHEET_MAX_WORKERS, len(panel_sheets))) as executor:
+                        sheet_results = list(executor.map(transform_panel_sheet, panel_sheets))
+                else:
+                    sheet_results = [transform_panel_sheet(sheet) for sheet in panel_sheets]
+            finally:
+                xl_file.close()
+                if shared_workbook is not None:
+                    shared_workbook.close()
 
-            # Process each panel sheet
+            # Process each panel sheet's result, accumulating summary totals as results are added
             results = []
             output_files = []
+            total_records = 0
+            total_geocodes = 0
 
-            for sheet in panel_sheets:
-                logger.info(f"Processing sheet: {sheet}")
-
-                # Transform the sheet with geocoding preference
-                result = ExcelTransformer.transform_sheet(input_path, sheet, terminated_ids, use_google_api)
-
+            for sheet, result in zip(panel_sheets, sheet_results):
                 if result['success']:
                     df = result['dataframe']
 
@@ -2247,6 +2703,7 @@ class ExcelTransformer:
                             # Use "SINGAPORE" for Singapore data, regardless of original sheet name
                             sg_display_name = "SINGAPORE"
 
+                            sg_geocodes = int(df_sg['Latitude'].notna().sum())
                             results.append({
                                 'sheet_name': sg_display_name,
                                 'output_filename': sg_filename,
@@ -2256,11 +2713,13 @@ class ExcelTransformer:
                                 'filtered_provider_codes': result.get('filtered_provider_codes', []),
                                 'geocoding_stats': {
                                     'total_records': len(df_sg),
-                                    'successful_geocodes': int(df_sg['Latitude'].notna().sum()),
-                                    'success_rate': f"{(df_sg['Latitude'].notna().sum()/len(df_sg)*100):.1f}%"
+                                    'successful_geocodes': sg_geocodes,
+                                    'success_rate': f"{(sg_geocodes/len(df_sg)*100):.1f}%"
                                 }
                             })
                             output_files.append(sg_filename)
+                            total_records += len(df_sg)
+                            total_geocodes += sg_geocodes
 
                         # Save Malaysia file
                         if len(df_my) > 0:
@@ -2273,6 +2732,7 @@ class ExcelTransformer:
                             # Use "MALAYSIA" for Malaysia data, regardless of original sheet name
                             my_display_name = "MALAYSIA"
 
+                            my_geocodes = int(df_my['Latitude'].notna().sum())
                             results.append({
                                 'sheet_name': my_display_name,
                                 'output_filename': my_filename,
@@ -2282,11 +2742,13 @@ class ExcelTransformer:
                                 'filtered_provider_codes': [],
                                 'geocoding_stats': {
                                     'total_records': len(df_my),
-                                    'successful_geocodes': int(df_my['Latitude'].notna().sum()),
-                                    'success_rate': f"{(df_my['Latitude'].notna().sum()/len(df_my)*100):.1f}%"
+                                    'successful_geocodes': my_geocodes,
+                                    'success_rate': f"{(my_geocodes/len(df_my)*100):.1f}%"
                                 }
                             })
                             output_files.append(my_filename)
+                            total_records += len(df_my)
+                            total_geocodes += my_geocodes
 
                         logger.info(f"SUCCESS: Separated sheet '{sheet}' into Singapore ({len(df_sg)} records) and Malaysia ({len(df_my)} records)")
                     else:
@@ -2311,6 +2773,8 @@ class ExcelTransformer:
                         }
                         results.append(sheet_result)
                         output_files.append(output_filename)
+                        total_records += result['records_processed']
+                        total_geocodes += result['geocoding_stats']['successful_geocodes']
 
                         logger.info(f"SUCCESS: Processed sheet '{sheet}': {result['records_processed']} records")
                 else:
@@ -2328,8 +2792,6 @@ class ExcelTransformer:
                 }
 
             # Calculate summary statistics
-            total_records = sum(r['records_processed'] for r in results)
-            total_geocodes = sum(r['geocoding_stats']['successful_geocodes'] for r in results)
             total_terminated = sum(r.get('terminated_clinics_filtered', 0) for r in results)
 
             # Aggregate all filtered provider codes from all sheets
@@ -2401,6 +2863,153 @@ class BatchProcessor:
 # Global batch processor instance
 batch_processor = BatchProcessor()
 
+class JobIndex:
+    """In-memory index of each job's output files, built once at job completion"""
+
+    def __init__(self, output_dir, ttl_seconds, job_timeout_seconds=UPLOAD_JOB_TIMEOUT_SECONDS):
+        self.output_dir = output_dir
+        self.ttl_seconds = ttl_seconds
+        self.job_timeout_seconds = job_timeout_seconds
+        self.jobs = {}  # job_id -> (created_at, {filename: entry})
+        self.lock = threading.Lock()
+
+    def _build_entries(self, job_id, filenames):
+        """Stat each output file and derive its sheet and download names"""
+        entries = {}
+        for filename in filenames:
+            try:
+                file_stats = os.stat(os.path.join(self.output_dir, filename))
+            except OSError:
+                continue
+
+            # Format: {job_id}_{sheet_name}.xlsx
+            sheet_part = filename.replace(f"{job_id}_", "").replace(".xlsx", "")
+            entries[filename] = {
+                'filename': filename,
+                'sheet_name': sheet_part,
+                'download_name': f"transformed_{sheet_part}.xlsx",
+                'size': file_stats.st_size,
+                'ctime': file_stats.st_ctime
+            }
+        return entries
+
+    def _pending_path(self, job_id):
+        """Marker file for a background job, visible to every worker sharing the output folder"""
+        return os.path.join(self.output_dir, f"{job_id}.pending")
+
+    def _write_pending(self, job_id, state):
+        """Atomically replace a background job's marker so readers never see a partial write"""
+        marker_path = self._pending_path(job_id)
+        tmp_path = f"{marker_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, marker_path)
+
+    def _clear_pending(self, job_id):
+        """Remove a background job's marker once it has completed or been cleaned up"""
+        try:
+            os.remove(self._pending_path(job_id))
+        except FileNotFoundError:
+            pass
+
+    def register_job(self, job_id, output_files):
+        """Record the output files of a completed job"""
+        entries = self._build_entries(job_id, output_files)
+        if entries:
+            # Age entries from the files themselves so they expire together with the TTL cleanup
+            created_at = min(entry['ctime'] for entry in entries.values())
+            with self.lock:
+                self.jobs[job_id] = (created_at, entries)
+            self._clear_pending(job_id)
+        return entries
+
+    def mark_processing(self, job_id):
+        """Record a job whose outputs are still being written in the background"""
+        self._write_pending(job_id, {'status': 'processing'})
+
+    def mark_failed(self, job_id, error, details=''):
+        """Record a background job that finished without output files"""
+        self._write_pending(job_id, {'status': 'failed', 'error': error, 'details': details})
+
+    def get_pending(self, job_id):
+        """Get the state of a background job that has not completed, or None"""
+        marker_path = self._pending_path(job_id)
+        try:
+            updated_at = os.path.getmtime(marker_path)
+            with open(marker_path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        age = time.time() - updated_at
+        if state.get('status') == 'processing':
+            if age <= self.job_timeout_seconds:
+                return state
+            # The job never reported back (worker killed or hung): fail it rather than letting
+            # get_job pick up whatever partial outputs it left behind
+            state = {
+                'status': 'failed',
+                'error': 'Processing timed out',
+                'details': f'No result after {self.job_timeout_seconds}s'
+            }
+            self._write_pending(job_id, state)
+            return state
+        # Failures are kept as long as files would be
+        if age <= self.ttl_seconds:
+            return state
+        self._clear_pending(job_id)
+        return None
+
+    def get_job(self, job_id):
+        """Get {filename: entry} for a job, or an empty dict if it has no files"""
+        with self.lock:
+            indexed = self.jobs.get(job_id)
+            if indexed is not None:
+                if time.time() - indexed[0] <= self.ttl_seconds:
+                    return indexed[1]
+                del self.jobs[job_id]
+
+        # A background job's files may be partially written until its marker is cleared,
+        # whichever worker is running it
+        if os.path.exists(self._pending_path(job_id)):
+            return {}
+
+        # Not indexed (e.g. after a restart or on another worker) - fall back to scanning disk
+        pattern = os.path.join(self.output_dir, f"{job_id}_*.xlsx")
+        return self.register_job(job_id, [os.path.basename(path) for path in glob.glob(pattern)])
+
+    def evict_job(self, job_id):
+        """Drop a job from the index once its files have been cleaned up"""
+        with self.lock:
+            self.jobs.pop(job_id, None)
+        self._clear_pending(job_id)
+
+# Global job output index
+job_index = JobIndex(PROCESSED_FOLDER, cleanup_service.ttl_seconds)
+
+def cleanup_job(job_id):
+    """Delete a job's files and drop it from the job index"""
+    job_index.evict_job(job_id)
+    cleanup_service.cleanup_job_files(job_id)
+
+# Executor for single uploads processed in the background (threads start on first submit)
+upload_executor = ThreadPoolExecutor(max_workers=UPLOAD_MAX_WORKERS) if CONCURRENT_SUPPORT else None
+
+def run_upload_job(input_path, job_id, use_google_api=True):
+    """Transform an uploaded file in the background and record the outcome in the job index"""
+    try:
+        result = ExcelTransformer.transform_excel_multi_sheet(input_path, PROCESSED_FOLDER, job_id, use_google_api)
+    except Exception as e:
+        logger.error(f"Background upload job {job_id} failed: {e}")
+        job_index.mark_failed(job_id, 'Internal server error', str(e))
+        return
+
+    if result['success'] and job_index.register_job(job_id, result['output_files']):
+        logger.info(f"Background upload job {job_id} completed: {len(result['output_files'])} files")
+    elif result['success']:
+        job_index.mark_failed(job_id, result['message'], 'No output files were produced')
+    else:
+        job_index.mark_failed(job_id, result['message'], result.get('error_details', ''))
+
 def process_single_file_in_batch(file_data, batch_id, use_google_api=True):
     """Process a single file as part of a batch job"""
     try:
@@ -2467,6 +3076,7 @@ def process_single_file_in_batch(file_data, batch_id, use_google_api=True):
             os.remove(input_path)
 
         if result['success']:
+            job_index.register_job(job_id, result['output_files'])
             file_result = {
                 'success': True,
                 'filename': original_filename,
@@ -2656,33 +3266,26 @@ def download_batch(batch_id):
 
         import zipfile
         import tempfile
-        import glob
 
         # Create temporary zip file
         temp_zip = tempfile.NamedTemporaryFile(delete=False, suffix='.zip')
 
         with zipfile.ZipFile(temp_zip.name, 'w') as zipf:
             for result in successful_results:
-                job_id = result['job_id']
                 original_filename = result['filename']
+                base_name = os.path.splitext(original_filename)[0]
 
-                # Find all files for this job
-                pattern = os.path.join(PROCESSED_FOLDER, f"{job_id}_*.xlsx")
-                matching_files = glob.glob(pattern)
-
-                for file_path in matching_files:
-                    filename = os.path.basename(file_path)
+                # All files for this job
+                for filename, entry in job_index.get_job(result['job_id']).items():
                     # Create descriptive archive names: originalname_sheetname.xlsx
-                    sheet_part = filename.replace(f"{job_id}_", "").replace(".xlsx", "")
-                    base_name = os.path.splitext(original_filename)[0]
-                    arc_name = f"{base_name}_{sheet_part}.xlsx"
-                    zipf.write(file_path, arc_name)
+                    arc_name = f"{base_name}_{entry['sheet_name']}.xlsx"
+                    zipf.write(os.path.join(PROCESSED_FOLDER, filename), arc_name)
 
 
         # Schedule cleanup for all batch jobs after zip is sent
         def cleanup_batch():
             for result in successful_results:
-                cleanup_service.cleanup_job_files(result['job_id'])
+                cleanup_job(result['job_id'])
         threading.Timer(2.0, cleanup_batch).start()
         
         return send_file(
@@ -2703,21 +3306,21 @@ def geocode_address():
         data = request.get_json()
         
         if not data:
-            return jsonify({'error': 'No JSON data provided'}), 400
+            return ojson({'error': 'No JSON data provided'}, 400)
         
         postal_code = data.get('postal_code')
         address = data.get('address')
         country = data.get('country')  # Optional: 'SINGAPORE' or 'MALAYSIA' to force region bias
 
         if not postal_code and not address:
-            return jsonify({'error': 'Either postal_code or address must be provided'}), 400
+            return ojson({'error': 'Either postal_code or address must be provided'}, 400)
 
-        geocoding_service = GeocodingService()
+        geocoding_service = get_geocoder()
         lat, lng, method = geocoding_service.geocode(postal_code, address, country=country)
         
         if lat is not None and lng is not None:
             google_maps_url = f"https://maps.google.com/?q={lat},{lng}"
-            return jsonify({
+            return ojson({
                 'success': True,
                 'latitude': lat,
                 'longitude': lng,
@@ -2727,18 +3330,18 @@ def geocode_address():
                 'address': address
             })
         else:
-            return jsonify({
+            return ojson({
                 'success': False,
                 'message': 'Could not geocode the provided postal code or address',
                 'postal_code': postal_code,
                 'address': address
-            }), 404
+            }, 404)
             
     except Exception as e:
-        return jsonify({
+        return ojson({
             'error': 'Internal server error',
             'details': str(e)
-        }), 500
+        }, 500)
 
 @app.route('/health', methods=['GET'])
 def health_check():
@@ -2759,7 +3362,7 @@ def health_check():
 
         # Try geocoding service initialization (with timeout protection)
         try:
-            geocoding_service = GeocodingService()
+            geocoding_service = get_geocoder()
 
             # Check postal code lookup status
             postal_status = len(geocoding_service.postal_code_lookup) > 0
@@ -2776,7 +3379,7 @@ def health_check():
                 'google_maps_api': {
                     'configured': google_api_configured,
                     'working': google_api_working,
-                    'api_key_present': '****' + geocoding_service.google_api_key[-4:] if google_api_configured else None
+                    'api_key_present': geocoding_service.masked_key
                 }
             }
 
@@ -2804,33 +3407,33 @@ def upload_file():
     try:
         # Basic request validation
         if 'file' not in request.files:
-            return jsonify({'error': 'No file provided'}), 400
+            return ojson({'error': 'No file provided'}, 400)
 
         file = request.files['file']
         if file.filename == '':
-            return jsonify({'error': 'No file selected'}), 400
+            return ojson({'error': 'No file selected'}, 400)
 
         # File extension validation
         if not file.filename.lower().endswith(('.xlsx', '.xls')):
-            return jsonify({'error': 'Invalid file format. Please upload Excel files only.'}), 400
+            return ojson({'error': 'Invalid file format. Please upload Excel files only.'}, 400)
 
         # File size validation (50MB limit)
         MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
         if hasattr(file, 'content_length') and file.content_length > MAX_FILE_SIZE:
-            return jsonify({'error': 'File too large. Maximum size is 50MB.'}), 413
+            return ojson({'error': 'File too large. Maximum size is 50MB.'}, 413)
 
         # Content length validation (for chunked requests)
         if request.content_length and request.content_length > MAX_FILE_SIZE:
-            return jsonify({'error': 'File too large. Maximum size is 50MB.'}), 413
+            return ojson({'error': 'File too large. Maximum size is 50MB.'}, 413)
 
         # Filename validation
         if len(file.filename) > 255:
-            return jsonify({'error': 'Filename too long. Maximum 255 characters.'}), 400
+            return ojson({'error': 'Filename too long. Maximum 255 characters.'}, 400)
 
         # Security: prevent path traversal
         import re
         if re.search(r'[<>:"|?*]|\.\.', file.filename):
-            return jsonify({'error': 'Invalid characters in filename.'}), 400
+            return ojson({'error': 'Invalid characters in filename.'}, 400)
 
         # Extract geocoding preference (default: True)
         use_google_api = request.form.get('use_google_api', 'true').lower() == 'true'
@@ -2855,16 +3458,29 @@ def upload_file():
             if os.path.exists(input_path):
                 os.remove(input_path)
             logger.warning(f"File validation failed for {file.filename}: {validation_error}")
-            return jsonify({'error': 'Invalid Excel file. File appears to be corrupted or not a valid Excel format.'}), 400
+            return ojson({'error': 'Invalid Excel file. File appears to be corrupted or not a valid Excel format.'}, 400)
+
+        # Optional background processing: respond immediately and let the client poll /status
+        if request.form.get('async', 'false').lower() == 'true' and upload_executor is not None:
+            job_index.mark_processing(job_id)
+            upload_executor.submit(run_upload_job, input_path, job_id, use_google_api)
+            logger.info(f"Job {job_id} queued for background processing")
+            return ojson({
+                'job_id': job_id,
+                'status': 'processing',
+                'status_url': f'/status/{job_id}'
+            }, 202)
 
         # Transform file with multi-sheet support and geocoding preference
         result = ExcelTransformer.transform_excel_multi_sheet(input_path, PROCESSED_FOLDER, job_id, use_google_api)
 
         if result['success']:
+            job_index.register_job(job_id, result['output_files'])
+
             # Build download URLs for each output file
             download_urls = [f'/download/{job_id}/{filename}' for filename in result['output_files']]
 
-            return jsonify({
+            return ojson({
                 'job_id': job_id,
                 'message': result['message'],
                 'sheets_processed': result['sheets_processed'],
@@ -2877,43 +3493,46 @@ def upload_file():
                 'summary_stats': result['summary_stats']
             })
         else:
-            return jsonify({
+            return ojson({
                 'error': result['message'],
                 'details': result.get('error_details', '')
-            }), 500
+            }, 500)
 
     except Exception as e:
-        return jsonify({
+        return ojson({
             'error': 'Internal server error',
             'details': str(e)
-        }), 500
+        }, 500)
 
 @app.route('/download/<job_id>/<filename>', methods=['GET'])
 def download_specific_file(job_id, filename):
     """Download a specific output file by job ID and filename"""
     try:
-        # Validate filename belongs to this job ID
-        if not filename.startswith(job_id):
+        # Validate filename belongs to this job ID (job IDs are UUIDs, so any
+        # path characters in job_id make the prefix check meaningless)
+        if secure_filename(job_id) != job_id or not filename.startswith(f"{job_id}_"):
             return jsonify({'error': 'Invalid file for this job'}), 400
 
-        output_path = os.path.join(PROCESSED_FOLDER, filename)
+        # Security: the resolved path must stay inside PROCESSED_FOLDER
+        processed_root = os.path.realpath(PROCESSED_FOLDER)
+        output_path = os.path.realpath(os.path.join(processed_root, filename))
+        if os.path.dirname(output_path) != processed_root:
+            return jsonify({'error': 'Invalid file for this job'}), 400
 
-        if not os.path.exists(output_path):
+        entry = job_index.get_job(job_id).get(filename)
+        if entry is None or not os.path.exists(output_path):
             return jsonify({'error': 'File not found'}), 404
 
-        # Extract sheet name from filename for better download name
-        # Format: {job_id}_{sheet_name}.xlsx
-        sheet_part = filename.replace(f"{job_id}_", "").replace(".xlsx", "")
-        download_name = f"transformed_{sheet_part}.xlsx"
-
         # NOTE: No immediate cleanup - rely on TTL-based cleanup (15 min)
         # to allow users to download all files from multi-file jobs
 
-        return send_file(
-            output_path,
+        return send_from_directory(
+            processed_root,
+            filename,
             as_attachment=True,
-            download_name=download_name,
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+            download_name=entry['download_name'],
+            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            conditional=True
         )
 
     except Exception as e:
@@ -2924,27 +3543,23 @@ def download_file(job_id):
     """Legacy endpoint - download first available file or create zip if multiple files"""
     try:
         # Look for files with this job_id
-        import glob
-        pattern = os.path.join(PROCESSED_FOLDER, f"{job_id}_*.xlsx")
-        matching_files = glob.glob(pattern)
+        job_files = job_index.get_job(job_id)
 
-        if not matching_files:
+        if not job_files:
             return jsonify({'error': 'No files found for this job'}), 404
 
-        if len(matching_files) == 1:
+        if len(job_files) == 1:
             # Single file - return directly
-            output_path = matching_files[0]
-            filename = os.path.basename(output_path)
-            sheet_part = filename.replace(f"{job_id}_", "").replace(".xlsx", "")
-            download_name = f"transformed_{sheet_part}.xlsx"
+            entry = next(iter(job_files.values()))
+            output_path = os.path.join(PROCESSED_FOLDER, entry['filename'])
 
             # Schedule cleanup after file is sent
-            threading.Timer(2.0, lambda: cleanup_service.cleanup_job_files(job_id)).start()
+            threading.Timer(2.0, lambda: cleanup_job(job_id)).start()
             
             return send_file(
                 output_path,
                 as_attachment=True,
-                download_name=download_name,
+                download_name=entry['download_name'],
                 mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
             )
         else:
@@ -2956,15 +3571,12 @@ def download_file(job_id):
             temp_zip = tempfile.NamedTemporaryFile(delete=False, suffix='.zip')
 
             with zipfile.ZipFile(temp_zip.name, 'w') as zipf:
-                for file_path in matching_files:
-                    filename = os.path.basename(file_path)
-                    sheet_part = filename.replace(f"{job_id}_", "").replace(".xlsx", "")
-                    arc_name = f"transformed_{sheet_part}.xlsx"
-                    zipf.write(file_path, arc_name)
+                for filename, entry in job_files.items():
+                    zipf.write(os.path.join(PROCESSED_FOLDER, filename), entry['download_name'])
 
             
             # Schedule cleanup after zip is sent
-            threading.Timer(2.0, lambda: cleanup_service.cleanup_job_files(job_id)).start()
+            threading.Timer(2.0, lambda: cleanup_job(job_id)).start()
             return send_file(
                 temp_zip.name,
                 as_attachment=True,
@@ -2979,39 +3591,37 @@ def download_file(job_id):
 def job_status(job_id):
     """Get status of processing job with support for multiple output files"""
     try:
-        import glob
+        # Background uploads report their state until their files are registered
+        pending = job_index.get_pending(job_id)
+        if pending is not None:
+            return ojson(pending, 202 if pending['status'] == 'processing' else 200)
 
         # Look for files with this job_id
-        pattern = os.path.join(PROCESSED_FOLDER, f"{job_id}_*.xlsx")
-        matching_files = glob.glob(pattern)
+        job_files = job_index.get_job(job_id)
 
-        if not matching_files:
-            return jsonify({'status': 'not_found'}), 404
+        if not job_files:
+            return ojson({'status': 'not_found'}, 404)
 
         # Gather information about all files
         files_info = []
         total_size = 0
         earliest_time = None
 
-        for file_path in matching_files:
-            file_stats = os.stat(file_path)
-            filename = os.path.basename(file_path)
-            sheet_part = filename.replace(f"{job_id}_", "").replace(".xlsx", "")
-
+        for filename, entry in job_files.items():
             file_info = {
                 'filename': filename,
-                'sheet_name': sheet_part,
-                'file_size': file_stats.st_size,
-                'created_at': datetime.fromtimestamp(file_stats.st_ctime).isoformat(),
+                'sheet_name': entry['sheet_name'],
+                'file_size': entry['size'],
+                'created_at': datetime.fromtimestamp(entry['ctime']).isoformat(),
                 'download_url': f'/download/{job_id}/{filename}'
             }
             files_info.append(file_info)
-            total_size += file_stats.st_size
+            total_size += entry['size']
 
-            if earliest_time is None or file_stats.st_ctime < earliest_time:
-                earliest_time = file_stats.st_ctime
+            if earliest_time is None or entry['ctime'] < earliest_time:
+                earliest_time = entry['ctime']
 
-        return jsonify({
+        return ojson({
             'status': 'completed',
             'files_count': len(files_info),
             'total_size': total_size,
@@ -3021,7 +3631,7 @@ def job_status(job_id):
         })
 
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return ojson({'error': str(e)}, 500)
 
 def filter_excluded_clinics(clinic_names_set, exclude_polyclinics, exclude_hospitals):
     """
@@ -3075,8 +3685,8 @@ def extract_clinic_names_from_excel(file_path):
 
                 # Find the header row by looking for 'Clinic Name' column
                 header_row = None
-                for idx in range(min(20, len(df_raw))):
-                    row_values = [str(val) for val in df_raw.iloc[idx].values if pd.notna(val)]
+                for idx, row in enumerate(df_raw.head(20).itertuples(index=False, name=None)):
+                    row_values = [str(val) for val in row if pd.notna(val)]
                     row_text_lower = ' | '.join(row_values).lower()
                     # Look for specific header indicators
                     if ('clinic name' in row_text_lower or 'clinic_name' in row_text_lower) and \
@@ -3218,7 +3828,7 @@ def extract_clinics_with_visit_counts(file_path):
         return result
 
     except Exception as e:
-        logger.error(f"Error extracting clinics with visit counts: {e}\n{traceback.format_exc()}")
+        logger.exception("Error extracting clinics with visit counts: %s", e)
         logger.warning("Falling back to empty list (will use alphabetical ordering)")
         return []
 
@@ -3440,7 +4050,7 @@ def generate_utilisation_report(file_path, exclude_polyclinics=False, exclude_ho
         return report_filename, total_visits, total_amount, clinic_count
 
     except Exception as e:
-        logger.error(f"Error generating utilisation report: {e}\n{traceback.format_exc()}")
+        logger.exception("Error generating utilisation report: %s", e)
         raise
 
 
@@ -3657,7 +4267,7 @@ def validate_clinic_file():
                     logger.debug(f"Could not immediately delete validation file (will be cleaned up later): {e}")
 
     except Exception as e:
-        logger.error(f"File validation error: {e}\n{traceback.format_exc()}")
+        logger.exception("File validation error: %s", e)
         return jsonify({'error': f'Validation failed: {str(e)}'}), 500
 
 
@@ -4081,7 +4691,7 @@ def match_clinics():
         return jsonify(response_data)
 
     except Exception as e:
-        logger.error(f"Error in match_clinics: {e}\n{traceback.format_exc()}")
+        logger.exception("Error in match_clinics: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -4309,6 +4919,36 @@ def calculate_haversine_distance(lat1: float, lng1: float, lat2: float, lng2: fl
     return round(distance, 2)  # Round to 2 decimal places (10m precision)
 
 
+def calculate_haversine_distances(lat1: float, lng1: float, lats2: np.ndarray, lngs2: np.ndarray) -> np.ndarray:
+    """
+    Vectorized Haversine distance from one point to many points.
+
+    Same formula as calculate_haversine_distance, evaluated over NumPy arrays
+    in a single pass instead of one Python call per candidate.
+
+    Args:
+        lat1, lng1: Origin coordinates (decimal degrees)
+        lats2, lngs2: Arrays of destination coordinates (decimal degrees)
+
+    Returns:
+        Array of distances in kilometers (unrounded)
+    """
+    R = 6371.0
+
+    lat1_rad = np.radians(lat1)
+    lng1_rad = np.radians(lng1)
+    lat2_rad = np.radians(lats2)
+    lng2_rad = np.radians(lngs2)
+
+    dlat = lat2_rad - lat1_rad
+    dlng = lng2_rad - lng1_rad
+
+    a = np.sin(dlat / 2)**2 + np.cos(lat1_rad) * np.cos(lat2_rad) * np.sin(dlng / 2)**2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+    return R * c
+
+
 def find_nearest_clinics(
     target_clinic: ClinicRecord,
     candidate_clinics: List[ClinicRecord],
@@ -4339,37 +4979,36 @@ def find_nearest_clinics(
         logger.warning(f"Cannot find alternatives for '{target_clinic.name}' - no coordinates")
         return []
 
-    # Calculate distances to all valid candidates
-    distances = []
-    for candidate in candidate_clinics:
-        # Skip candidates without coordinates
-        if not candidate.latitude or not candidate.longitude:
-            continue
-
-        # Calculate distance
-        distance = calculate_haversine_distance(
-            target_clinic.latitude,
-            target_clinic.longitude,
-            candidate.latitude,
-            candidate.longitude
-        )
+    # Skip candidates without coordinates
+    valid_candidates = [c for c in candidate_clinics if c.latitude and c.longitude]
+
+    # Calculate distances to all valid candidates in one vectorized pass
+    raw_distances = calculate_haversine_distances(
+        target_clinic.latitude,
+        target_clinic.longitude,
+        np.fromiter((c.latitude for c in valid_candidates), dtype=np.float64, count=len(valid_candidates)),
+        np.fromiter((c.longitude for c in valid_candidates), dtype=np.float64, count=len(valid_candidates))
+    )
+    # Round to 2 decimal places (10m precision), matching calculate_haversine_distance
+    distances = [round(d, 2) for d in raw_distances.tolist()]
+
+    # Sort by distance (ascending, stable) and build results for the top K only
+    top_k = []
+    for i in sorted(range(len(distances)), key=distances.__getitem__)[:k]:
+        candidate = valid_candidates[i]
 
         # Check if this candidate is already matched
         is_matched = candidate.normalized_name in matched_clinic_names
 
-        distances.append(
+        top_k.append(
             AlternativeClinic(
                 clinic=candidate,
-                distance_km=distance,
+                distance_km=distances[i],
                 is_matched=is_matched,
                 matched_to="MATCHED" if is_matched else None  # Placeholder, updated by caller
             )
         )
 
-    # Sort by distance (ascending) and return top K
-    distances.sort(key=lambda x: x.distance_km)
-    top_k = distances[:k]
-
     logger.info(f"Found {len(top_k)} alternatives for '{target_clinic.name}' (from {len(distances)} candidates)")
 
     return top_k
@@ -4457,7 +5096,7 @@ def extract_clinics_with_addresses(file_path: str) -> List[ClinicRecord]:
     clinics = []
 
     # Initialize geocoding service (reuse postal lookup table across all clinics)
-    geocoding_service = GeocodingService(use_google_api=True)
+    geocoding_service = get_geocoder(use_google_api=True)
     geocoded_count = 0
     geocode_failed_count = 0
 
@@ -4472,8 +5111,8 @@ def extract_clinics_with_addresses(file_path: str) -> List[ClinicRecord]:
 
                 # Find header row (reuse existing logic)
                 header_row = None
-                for idx in range(min(20, len(df_raw))):
-                    row_values = [str(val) for val in df_raw.iloc[idx].values if pd.notna(val)]
+                for idx, row in enumerate(df_raw.head(20).itertuples(index=False, name=None)):
+                    row_values = [str(val) for val in row if pd.notna(val)]
                     row_text_lower = ' | '.join(row_values).lower()
 
                     if ('clinic name' in row_text_lower or 'clinic_name' in row_text_lower or 'clinic' in row_text_lower):
@@ -5195,7 +5834,7 @@ def generate_match_report_enhanced(matches: List[ClinicMatch],
         return output_path
 
     except Exception as e:
-        logger.error(f"Error generating match report: {e}\n{traceback.format_exc()}")
+        logger.exception("Error generating match report: %s", e)
         raise
 
 
@@ -5547,7 +6186,7 @@ def mc_process_files():
             el_only_filename = f"MediacorpEmployee_{el_file_date}.xlsx"
             el_only_path = os.path.join(PROCESSED_FOLDER, el_only_filename)
             el_only_df = processed_el.drop(columns=['ADC Remarks'], errors='ignore')
-            el_only_df.to_excel(el_only_path, index=False, engine='openpyxl')
+            el_only_df.to_excel(el_only_path, index=False, engine='xlsxwriter')
             logger.info(f"  EL-only file: {el_only_filename} ({len(el_only_df)} rows)")
 
             # Generate standalone DL file (without Inspro ADC Remarks)
@@ -5556,7 +6195,7 @@ def mc_process_files():
             dl_only_filename = f"MediacorpDependant_{dl_file_date}.xlsx"
             dl_only_path = os.path.join(PROCESSED_FOLDER, dl_only_filename)
             dl_only_df = processed_dl.drop(columns=['Inspro ADC Remarks'], errors='ignore')
-            dl_only_df.to_excel(dl_only_path, index=False, engine='openpyxl')
+            dl_only_df.to_excel(dl_only_path, index=False, engine='xlsxwriter')
             logger.info(f"  DL-only file: {dl_only_filename} ({len(dl_only_df)} rows)")
 
             step4_elapsed = time.time() - step4_start
@@ -5638,8 +6277,7 @@ def mc_process_files():
         elapsed = time.time() - start_time
         logger.error("=" * 60)
         logger.error(f"MC ADC PROCESSING - FAILED after {elapsed:.2f}s")
-        logger.error(f"  Error: {e}")
-        logger.error(f"  Traceback:\n{traceback.format_exc()}")
+        logger.exception("  Error: %s", e)
         logger.error("=" * 60)
         return jsonify({
             'error': 'Processing failed',
@@ -5792,7 +6430,7 @@ def gp_panel_compare():
         }), 400
 
     except Exception as e:
-        logger.error(f"GP Panel comparison failed: {e}\n{traceback.format_exc()}")
+        logger.exception("GP Panel comparison failed: %s", e)
         return jsonify({
             'error': 'Processing failed',
             'details': str(e)
@@ -5910,7 +6548,7 @@ def renewal_compare():
         }), 400
 
     except Exception as e:
-        logger.error(f"Renewal comparison failed: {e}\n{traceback.format_exc()}")
+        logger.exception("Renewal comparison failed: %s", e)
         return jsonify({
             'error': 'Processing failed',
             'details': str(e)
@@ -5956,7 +6594,8 @@ def startup_check():
 
         # Test geocoding service initialization (non-blocking)
         try:
-            geocoding_service = GeocodingService()
+            # Warm the shared service so preloaded workers inherit the postal lookup
+            geocoding_service = get_geocoder()
             logger.info("Geocoding service initialized successfully")
         except Exception as e:
             logger.warning(f"Geocoding service initialization issue: {e}")
@@ -8,15 +8,51 @@ import logging
 import threading
 import glob
 
+try:
+    import fcntl
+    FCNTL_SUPPORT = True
+except ImportError:
+    # Windows: no advisory file locks, every process runs its own cleanup
+    FCNTL_SUPPORT = False
+
 logger = logging.getLogger(__name__)
 
 class CleanupService:
-    def __init__(self, upload_folder, processed_folder, ttl_minutes=15):
+    def __init__(self, upload_folder, processed_folder, ttl_minutes=15, job_timeout_seconds=0):
         self.upload_folder = upload_folder
         self.processed_folder = processed_folder
         self.ttl_seconds = ttl_minutes * 60
+        # Background job markers ({job_id}.pending) must outlive a still-running job, so they
+        # are only swept once its deadline and the failure retention have both passed
+        self.marker_ttl_seconds = self.ttl_seconds + job_timeout_seconds
         self.cleanup_interval = 600  # Run every 10 minutes
         self.cleanup_thread = None
+        # Only the process holding this lock scans the folders, so multiple
+        # gunicorn workers don't repeat (and race) the same cleanup
+        self.lock_path = os.path.join(os.path.dirname(os.path.abspath(processed_folder)), '.cleanup.lock')
+        self.lock_file = None
+
+    def _acquire_cleanup_lock(self):
+        """Return True if this process is (or just became) the cleanup leader"""
+        if not FCNTL_SUPPORT:
+            return True
+        if self.lock_file is not None:
+            return True
+
+        lock_file = None
+        try:
+            lock_file = open(self.lock_path, 'a')
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError as e:
+            if lock_file is not None:
+                lock_file.close()
+            logger.debug(f"Cleanup lock held by another process: {e}")
+            return False
+
+        # Keep the file open: the lock is held for the life of this process
+        self.lock_file = lock_file
+        logger.info(f"Acquired cleanup lock (pid {os.getpid()})")
+        return True
 
     def cleanup_job_files(self, job_id):
         """Delete all files associated with a specific job_id"""
@@ -72,27 +108,33 @@ class CleanupService:
                 files_cleaned = 0
                 size_freed = 0
 
-                for filename in os.listdir(folder):
-                    filepath = os.path.join(folder, filename)
-
-                    # Skip directories
-                    if os.path.isdir(filepath):
-                        continue
-
-                    try:
-                        # Get file age
-                        file_age = current_time - os.path.getmtime(filepath)
-
-                        # Remove if older than TTL
-                        if file_age > self.ttl_seconds:
-                            file_size = os.path.getsize(filepath)
-                            os.remove(filepath)
-                            files_cleaned += 1
-                            size_freed += file_size
-                            logger.info(f"TTL cleanup: {filename} (age: {file_age/60:.1f}min, size: {file_size/1024:.1f}KB)")
-
-                    except Exception as e:
-                        logger.warning(f"Failed to clean up {filename}: {e}")
+                # scandir entries carry the file type from the directory read, so
+                # each file costs a single stat() for both age and size
+                with os.scandir(folder) as entries:
+                    for entry in entries:
+                        filename = entry.name
+
+                        try:
+                            # Skip directories
+                            if entry.is_dir():
+                                continue
+
+                            # Get file age
+                            stat_result = entry.stat()
+                            file_age = current_time - stat_result.st_mtime
+
+                            # Remove if older than TTL
+                            is_job_marker = filename.endswith('.pending') or (
+                                '.pending.' in filename and filename.endswith('.tmp'))
+                            if file_age > (self.marker_ttl_seconds if is_job_marker else self.ttl_seconds):
+                                file_size = stat_result.st_size
+                                os.remove(entry.path)
+                                files_cleaned += 1
+                                size_freed += file_size
+                                logger.info(f"TTL cleanup: {filename} (age: {file_age/60:.1f}min, size: {file_size/1024:.1f}KB)")
+
+                        except Exception as e:
+                            logger.warning(f"Failed to clean up {filename}: {e}")
 
                 if files_cleaned > 0:
                     total_cleaned += files_cleaned
@@ -113,6 +155,8 @@ class CleanupService:
         while True:
             try:
                 time.sleep(self.cleanup_interval)
+                if not self._acquire_cleanup_lock():
+                    continue
                 logger.info("Running scheduled file cleanup...")
                 self.cleanup_old_files()
             except Exception as e:
@@ -134,6 +178,9 @@ class CleanupService:
 
     def startup_cleanup(self):
         """Run cleanup on startup to remove orphaned files"""
+        if not self._acquire_cleanup_lock():
+            logger.info("Startup cleanup skipped: another process holds the cleanup lock")
+            return 0, 0
         logger.info("Running startup cleanup for orphaned files...")
         count, size = self.cleanup_old_files()
         return count, size
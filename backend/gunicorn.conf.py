@@ -5,9 +5,15 @@ bind = f"0.0.0.0:{os.environ.get('PORT', '10000')}"
 backlog = 2048
 
 # Worker processes - optimized for free tier
-workers = 1
-worker_class = 'sync'
-worker_connections = 500  # Reduced for memory efficiency
+# gthread runs each request on an OS thread, so a long CPU-bound transform no
+# longer starves /health and downloads the way it did on a single gevent hub,
+# while geocoding HTTP waits still overlap.
+# Batch job state lives in process memory, so only raise WEB_CONCURRENCY once
+# that state is shared between workers.
+workers = int(os.environ.get('WEB_CONCURRENCY', 1))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+worker_connections = 1000
 timeout = 300
 keepalive = 2
 
@@ -18,10 +18,13 @@ echo "Working directory: $(pwd)"
 echo "Environment: $FLASK_ENV"
 
 # Start Gunicorn with Azure-optimized settings
+# One worker: batch job state lives in process memory (see gunicorn.conf.py);
+# gthread's threads provide the request concurrency instead
 echo "Starting Gunicorn..."
 gunicorn --bind=0.0.0.0:8000 \
-         --workers=2 \
-         --worker-class=sync \
+         --workers=1 \
+         --worker-class=gthread \
+         --threads=8 \
          --timeout=300 \
          --access-logfile=- \
          --error-logfile=- \
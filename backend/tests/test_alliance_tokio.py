@@ -0,0 +1,41 @@
+"""Alliance-Tokio header detection on read-only worksheets"""
+import os
+import re
+import sys
+import zipfile
+
+from openpyxl import Workbook, load_workbook
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import ExcelTransformer  # noqa: E402
+
+
+def _write_with_wrong_dimension(path):
+    """Write Alliance-Tokio style header rows, then shrink the sheet's <dimension> tag to A1"""
+    wb = Workbook()
+    ws = wb.active
+    ws.append(['S/N', 'ZONE', 'ESTATE', 'CLINIC NAME', 'ADDRESS', 'POSTAL CODE'])
+    ws.append([None, None, None, None, None, None, 'MON - FRI', 'SAT', 'SUN'])
+    ws.append([1, 'EAST', 'BEDOK', 'Clinic A', '1 Road', '123456'])
+    wb.save(path)
+
+    with zipfile.ZipFile(path) as src:
+        parts = {name: src.read(name) for name in src.namelist()}
+    sheet, replaced = re.subn(r'<dimension ref="[^"]*" ?/>', '<dimension ref="A1"/>', parts['xl/worksheets/sheet1.xml'].decode())
+    assert replaced == 1
+    parts['xl/worksheets/sheet1.xml'] = sheet.encode()
+    with zipfile.ZipFile(path, 'w') as dst:
+        for name, data in parts.items():
+            dst.writestr(name, data)
+
+
+def test_headers_detected_despite_wrong_dimension_tag(tmp_path):
+    path = str(tmp_path / 'alliance.xlsx')
+    _write_with_wrong_dimension(path)
+
+    wb = load_workbook(path, read_only=True)
+    try:
+        assert ExcelTransformer.has_alliance_tokio_headers(wb.active)
+    finally:
+        wb.close()
@@ -0,0 +1,42 @@
+"""Round-trip checks for ExcelTransformer.write_excel_with_text_postal_codes"""
+import os
+import sys
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import ExcelTransformer  # noqa: E402
+
+
+def test_inf_and_datetime_round_trip(tmp_path):
+    output_path = str(tmp_path / 'out.xlsx')
+    df = pd.DataFrame({
+        'Code': ['A1', 'A2', 'A3'],
+        'PostalCode': ['018956', '123456', None],
+        'Score': [1.5, np.inf, -np.inf],
+        'Updated': [datetime(2024, 1, 2, 3, 4, 5), pd.Timestamp('2024-06-30 12:00:00'), pd.NaT],
+    })
+
+    ExcelTransformer.write_excel_with_text_postal_codes(df, output_path)
+
+    wb = load_workbook(output_path)
+    try:
+        ws = wb.active
+        assert [cell.value for cell in ws[1]] == ['Code', 'PostalCode', 'Score', 'Updated']
+        # Postal codes stay text, with their leading zero
+        assert ws['B2'].value == '018956'
+        # inf/-inf are written as the 'inf'/'-inf' text pandas' openpyxl writer produced
+        assert ws['C2'].value == 1.5
+        assert ws['C3'].value == 'inf'
+        assert ws['C4'].value == '-inf'
+        # Datetimes are real dates shown in the same format the openpyxl writer used
+        assert ws['D2'].value == datetime(2024, 1, 2, 3, 4, 5)
+        assert ws['D2'].number_format == 'yyyy-mm-dd hh:mm:ss'
+        assert ws['D3'].value == datetime(2024, 6, 30, 12, 0, 0)
+        assert ws['D4'].value is None
+    finally:
+        wb.close()
@@ -0,0 +1,81 @@
+"""JobIndex state shared between workers through the processed folder"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import JobIndex  # noqa: E402
+from cleanup_service import CleanupService  # noqa: E402
+
+
+def test_pending_job_is_visible_to_other_workers(tmp_path):
+    # Two indexes over one folder stand in for two gunicorn workers
+    accepting, other = JobIndex(str(tmp_path), 900), JobIndex(str(tmp_path), 900)
+    job_id = 'job1'
+
+    accepting.mark_processing(job_id)
+    # A partially written output must not be served as a completed job
+    (tmp_path / f"{job_id}_Sheet.xlsx").write_bytes(b'partial')
+    assert other.get_pending(job_id) == {'status': 'processing'}
+    assert other.get_job(job_id) == {}
+
+    accepting.register_job(job_id, [f"{job_id}_Sheet.xlsx"])
+    assert other.get_pending(job_id) is None
+    assert list(other.get_job(job_id)) == [f"{job_id}_Sheet.xlsx"]
+
+
+def test_failed_job_is_visible_to_other_workers(tmp_path):
+    accepting, other = JobIndex(str(tmp_path), 900), JobIndex(str(tmp_path), 900)
+
+    accepting.mark_failed('job2', 'Processing failed', 'bad sheet')
+    assert other.get_pending('job2') == {'status': 'failed', 'error': 'Processing failed', 'details': 'bad sheet'}
+    assert other.get_job('job2') == {}
+
+    other.evict_job('job2')
+    assert accepting.get_pending('job2') is None
+    assert not list(tmp_path.iterdir())
+
+
+def _age(path, seconds):
+    """Backdate a file's mtime"""
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+def test_processing_job_past_its_deadline_is_failed(tmp_path):
+    index = JobIndex(str(tmp_path), ttl_seconds=900, job_timeout_seconds=60)
+    index.mark_processing('job3')
+    # The worker died after writing part of the output
+    (tmp_path / 'job3_Sheet.xlsx').write_bytes(b'partial')
+    _age(tmp_path / 'job3.pending', 120)
+
+    state = index.get_pending('job3')
+    assert state['status'] == 'failed'
+    assert state['error'] == 'Processing timed out'
+    # The partial output is never registered as a completed job
+    assert index.get_job('job3') == {}
+    # The failure is then kept for the normal retention period
+    assert index.get_pending('job3')['status'] == 'failed'
+
+
+def test_ttl_sweep_keeps_markers_of_running_jobs(tmp_path):
+    uploads, processed = tmp_path / 'uploads', tmp_path / 'processed'
+    uploads.mkdir()
+    processed.mkdir()
+    service = CleanupService(str(uploads), str(processed), ttl_minutes=1, job_timeout_seconds=600)
+    index = JobIndex(str(processed), service.ttl_seconds, job_timeout_seconds=600)
+
+    index.mark_processing('job4')
+    (processed / 'job4_Sheet.xlsx').write_bytes(b'partial')
+    (processed / 'job5.pending').write_text('{"status": "failed"}')
+    _age(processed / 'job4.pending', 120)
+    _age(processed / 'job4_Sheet.xlsx', 120)
+    _age(processed / 'job5.pending', 1200)
+
+    service.cleanup_old_files()
+
+    # Outputs past the TTL go, but a marker is kept until the job's deadline has also passed
+    assert sorted(path.name for path in processed.iterdir()) == ['job4.pending']
+    assert index.get_pending('job4') == {'status': 'processing'}
+    assert index.get_job('job4') == {}
@@ -0,0 +1,93 @@
+"""Multi-sheet transform resilience"""
+import os
+import sys
+import threading
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app  # noqa: E402
+from app import ExcelTransformer  # noqa: E402
+
+
+def _write_panel_workbook(path):
+    df = pd.DataFrame({
+        'S/N': [1, 2],
+        'IHP CLINIC ID': ['CG001', 'CG002'],
+        'CLINIC NAME': ['Clinic 1', 'Clinic 2'],
+        'ADDRESS': ['BLK 1 TEST STREET SINGAPORE 018956', 'BLK 2 SAMPLE ROAD SINGAPORE 018957'],
+        'TEL NO.': ['61234567', '67654321'],
+    })
+    with pd.ExcelWriter(path, engine='openpyxl') as writer:
+        df.to_excel(writer, sheet_name='GP Panel', index=False)
+        df.to_excel(writer, sheet_name='SP Panel', index=False)
+
+
+def test_read_only_load_failure_falls_back_per_sheet(tmp_path, monkeypatch):
+    input_path = str(tmp_path / 'panel.xlsx')
+    _write_panel_workbook(input_path)
+
+    original_load = app.load_workbook_safe
+
+    def failing_read_only_load(path, **kwargs):
+        if kwargs.get('read_only'):
+            raise OSError('corrupt sheet part')
+        return original_load(path, **kwargs)
+
+    monkeypatch.setattr(app, 'load_workbook_safe', failing_read_only_load)
+    # The shared read-only workbook is only opened when sheets run on one thread
+    monkeypatch.setattr(app, 'CONCURRENT_SUPPORT', False)
+
+    result = ExcelTransformer.transform_excel_multi_sheet(input_path, str(tmp_path), 'job', use_google_api=False)
+
+    assert result['success']
+    assert result['sheets_processed'] == 2
+    assert result['total_records'] == 4
+
+
+def test_concurrent_sheets_do_not_share_handles(tmp_path, monkeypatch):
+    input_path = str(tmp_path / 'panel.xlsx')
+    _write_panel_workbook(input_path)
+
+    original_transform = ExcelTransformer.transform_sheet
+    calls = []
+
+    def recording_transform(*args, workbook=None, excel_file=None, **kwargs):
+        calls.append((threading.get_ident(), workbook, excel_file))
+        return original_transform(*args, workbook=workbook, excel_file=excel_file, **kwargs)
+
+    monkeypatch.setattr(ExcelTransformer, 'transform_sheet', staticmethod(recording_transform))
+
+    result = ExcelTransformer.transform_excel_multi_sheet(input_path, str(tmp_path), 'job', use_google_api=False)
+
+    assert result['success']
+    assert result['total_records'] == 4
+    assert len(calls) == 2
+    # Sheets on worker threads open their own workbook and ExcelFile
+    assert all(workbook is None and excel_file is None for _, workbook, excel_file in calls)
+    assert all(thread_id != threading.get_ident() for thread_id, _, _ in calls)
+
+
+def test_non_alliance_sheets_never_fully_load_the_workbook(tmp_path, monkeypatch):
+    input_path = str(tmp_path / 'panel.xlsx')
+    _write_panel_workbook(input_path)
+
+    original_load = app.load_workbook_safe
+    full_loads = []
+
+    def recording_load(path, **kwargs):
+        if not kwargs.get('read_only'):
+            full_loads.append(path)
+        return original_load(path, **kwargs)
+
+    monkeypatch.setattr(app, 'load_workbook_safe', recording_load)
+
+    # Both the threaded and the sequential paths only read header rows read-only
+    for concurrent in (True, False):
+        monkeypatch.setattr(app, 'CONCURRENT_SUPPORT', concurrent)
+        result = ExcelTransformer.transform_excel_multi_sheet(input_path, str(tmp_path), 'job', use_google_api=False)
+        assert result['success']
+        assert result['sheets_processed'] == 2
+
+    assert full_loads == []